@@ -1,25 +1,146 @@
 import os
+import queue
+import atexit
 import logging
-from datetime import datetime
+import subprocess
+import orjson
+from logging.handlers import QueueHandler, QueueListener
 from flask import Flask, request, jsonify
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
 from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.middleware.profiler import ProfilerMiddleware
+from celery import Celery
+from celery.result import AsyncResult
+from streaming_form_data.parser import ParseFailedException
 
-from config import Config
-from audio_processor import AudioProcessor
+from config import Config, MAX_FILE_SIZE_BYTES
+from audio_processor import AudioProcessor, InvalidAudioFile
 from temperature_analyzer import TemperatureAnalyzer
+from timestamps import now_iso
+from response_cache import ResponseCache
+
+# Configure logging. Request threads only enqueue records; a background
+# listener thread does the formatting and stream I/O.
+log_queue = queue.SimpleQueue()
+log_stream_handler = logging.StreamHandler()
+log_stream_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+log_queue_handler = QueueHandler(log_queue)
+log_queue_handler.setFormatter(logging.Formatter('%(message)s'))
+log_listener = QueueListener(log_queue, log_stream_handler)
+
+logging.basicConfig(level=logging.INFO, handlers=[log_queue_handler])
+log_listener.start()
+atexit.register(log_listener.stop)
+
+# Threads don't survive fork, so restart the listener in forked server workers
+os.register_at_fork(after_in_child=log_listener.start)
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
+class ORJSONProvider(JSONProvider):
+    """Flask JSON provider backed by orjson, used by jsonify and request.get_json."""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS),
+            mimetype='application/json'
+        )
+
+# Error responses by tag. The bodies are serialized once here; only the
+# timestamp is spliced in per response.
+_ERRORS = {
+    'file_too_large': {
+        'error': 'File too large',
+        'details': f'Maximum file size is {Config.MAX_FILE_SIZE_MB}MB'
+    },
+    'invalid_audio': {
+        'error': 'Invalid audio file'
+    },
+    'invalid_request': {
+        'error': 'Invalid request',
+        'details': 'Request must be multipart/form-data with an audio file in the "audio" field'
+    },
+    'no_audio': {
+        'error': 'No audio file provided',
+        'details': 'Request must include an audio file in the "audio" field'
+    },
+    'file_processing': {
+        'error': 'File processing error',
+        'details': 'Failed to process uploaded file'
+    },
+    'unexpected': {
+        'error': 'Internal server error',
+        'details': 'An unexpected error occurred'
+    },
+    'queue_disabled': {
+        'error': 'Background analysis disabled',
+        'details': 'No task queue is configured on this server'
+    },
+    'job_failed': {
+        'error': 'Analysis failed',
+        'details': 'The background analysis job failed'
+    },
+    'not_found': {
+        'error': 'Endpoint not found',
+        'details': 'The requested endpoint does not exist',
+        'available_endpoints': ['/health', '/analyze-audio', '/analyze-audio/<job_id>']
+    },
+    'method_not_allowed': {
+        'error': 'Method not allowed',
+        'details': 'The HTTP method is not allowed for this endpoint'
+    },
+    'server_error': {
+        'error': 'Internal server error',
+        'details': 'An unexpected server error occurred'
+    },
+    'profiler_unavailable': {
+        'error': 'Profiler unavailable'
+    }
+}
+_ERROR_TEMPLATES = {
+    tag: orjson.dumps(body)[:-1] + b',"timestamp":"%s"}'
+    for tag, body in _ERRORS.items()
+}
+_JSON_HEADERS = {'Content-Type': 'application/json'}
+
+def _error(status, tag, details=None):
+    """
+    Build an error response from its pre-serialized template.
+    
+    Passing details overrides the template's details, at the cost of
+    serializing the body for this response.
+    """
+    if details is None:
+        body = _ERROR_TEMPLATES[tag] % now_iso().encode('ascii')
+    else:
+        body = orjson.dumps({**_ERRORS[tag], 'details': details, 'timestamp': now_iso()})
+    return body, status, _JSON_HEADERS
+
 # Create Flask app
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 app.config['MAX_CONTENT_LENGTH'] = Config.MAX_FILE_SIZE_BYTES
 
+# Opt-in per-request profiling: a summary of the top 30 functions is appended
+# to profile.log and the full .prof files are written to PROFILE_DIR
+if Config.PROFILE:
+    os.makedirs(Config.PROFILE_DIR, exist_ok=True)
+    app.wsgi_app = ProfilerMiddleware(
+        app.wsgi_app,
+        stream=open(os.path.join(Config.PROFILE_DIR, 'profile.log'), 'a'),
+        profile_dir=Config.PROFILE_DIR,
+        sort_by=('cumulative',),
+        restrictions=[30]
+    )
+
 # Configure CORS
 CORS(app, 
      origins=Config.CORS_ORIGINS,
@@ -27,125 +148,82 @@ CORS(app,
      allow_headers=['Content-Type', 'Authorization'],
      supports_credentials=False)
 
-# Initialize components
-audio_processor = AudioProcessor()
-
-# Initialize temperature analyzer with error handling
+# Ensure upload directory exists and has room for concurrent uploads
 try:
-    temperature_analyzer = TemperatureAnalyzer()
-    logger.info("Temperature analyzer initialized successfully")
+    AudioProcessor.check_upload_folder_space()
 except Exception as e:
-    logger.error(f"Failed to initialize temperature analyzer: {str(e)}")
-    logger.error("Please check your OpenAI API key in the .env file")
+    logger.error(f"Upload folder check failed: {str(e)}")
+    logger.error("Set UPLOAD_FOLDER to a directory on a disk with enough free space")
     raise SystemExit(f"Startup failed: {str(e)}")
 
-@app.route('/health', methods=['GET'])
-def health_check():
-    """Simple health check endpoint."""
-    return jsonify({
-        'status': 'healthy',
-        'timestamp': datetime.utcnow().isoformat() + 'Z',
-        'version': '1.0.0'
-    })
+# Initialize components
+audio_processor = AudioProcessor()
+audio_processor.start_orphan_sweeper()
+response_cache = ResponseCache()
 
-@app.route('/analyze-audio', methods=['POST'])
-def analyze_audio():
+# Background analysis queue, used only when a broker is configured
+celery = Celery(
+    app.import_name,
+    broker=Config.CELERY_BROKER_URL,
+    backend=Config.CELERY_RESULT_BACKEND
+)
+
+def run_analysis(file_path, cache_key=None):
     """
-    Main endpoint for analyzing audio and returning temperature score.
+    Run the analysis pipeline on an uploaded audio file and clean it up.
+    
+    Used directly by the request handler, or by the Celery worker when a
+    broker is configured. Successful responses are stored in the response
+    cache under cache_key, if given.
     
-    Expects:
-        POST request with multipart/form-data containing 'audio' file
-        
     Returns:
-        JSON response with temperature analysis
+        Tuple of (response_data, status_code)
     """
-    temp_file_path = None
+    temp_file_paths = [file_path]
     
     try:
-        logger.info(f"Received audio analysis request from {request.remote_addr}")
-        logger.info(f"Request headers: {dict(request.headers)}")
-        logger.info(f"Request files: {list(request.files.keys())}")
-        logger.info(f"Content type: {request.content_type}")
-        
-        # Check if audio file is present
-        if 'audio' not in request.files:
-            logger.warning("No audio file in request")
-            return jsonify({
-                'error': 'No audio file provided',
-                'details': 'Request must include an audio file in the "audio" field',
-                'timestamp': datetime.utcnow().isoformat() + 'Z'
-            }), 400
-        
-        audio_file = request.files['audio']
-        logger.info(f"Received audio file: {audio_file.filename}, size: {audio_file.content_length if hasattr(audio_file, 'content_length') else 'unknown'}")
-        
-        # Validate the audio file
-        is_valid, error_message = audio_processor.validate_audio_file(audio_file)
-        if not is_valid:
-            logger.warning(f"Audio file validation failed: {error_message}")
-            return jsonify({
-                'error': 'Invalid audio file',
-                'details': error_message,
-                'timestamp': datetime.utcnow().isoformat() + 'Z'
-            }), 400
-        
-        logger.info(f"Processing audio file: {audio_file.filename}")
-        
-        # Save audio file temporarily
-        try:
-            temp_file_path = audio_processor.save_temporary_file(audio_file)
-        except Exception as e:
-            logger.error(f"Failed to save temporary file: {str(e)}")
-            return jsonify({
-                'error': 'File processing error',
-                'details': 'Failed to process uploaded file',
-                'timestamp': datetime.utcnow().isoformat() + 'Z'
-            }), 500
-        
         # Validate audio duration and properties
-        is_valid_duration, duration_error, duration = audio_processor.validate_audio_duration(temp_file_path)
+        is_valid_duration, duration_error, duration = audio_processor.validate_audio_duration(file_path)
         if not is_valid_duration:
-            return jsonify({
+            return {
                 'error': 'Invalid audio duration',
                 'details': duration_error,
-                'timestamp': datetime.utcnow().isoformat() + 'Z'
-            }), 400
+                'timestamp': now_iso()
+            }, 400
         
         # Prepare audio for transcription
         try:
-            processed_file_path = audio_processor.prepare_audio_for_transcription(temp_file_path)
+            processed_file_path = audio_processor.prepare_audio_for_transcription(file_path)
+            if processed_file_path != file_path:
+                temp_file_paths.append(processed_file_path)
         except Exception as e:
             logger.error(f"Failed to prepare audio: {str(e)}")
-            return jsonify({
+            return {
                 'error': 'Audio processing error',
                 'details': str(e),
-                'timestamp': datetime.utcnow().isoformat() + 'Z'
-            }), 500
-        
-        # Get audio metadata
-        audio_info = audio_processor.get_audio_info(processed_file_path)
-        logger.info(f"Audio info: {audio_info}")
+                'timestamp': now_iso()
+            }, 500
         
         # Analyze the audio file
         try:
-            analysis_result = temperature_analyzer.analyze_audio_file(processed_file_path)
+            analysis_result = TemperatureAnalyzer.analyze_audio_file(processed_file_path)
         except Exception as e:
             logger.error(f"Analysis failed: {str(e)}")
-            return jsonify({
+            return {
                 'error': 'Analysis failed',
                 'details': f'Unable to analyze audio: {str(e)}',
-                'timestamp': datetime.utcnow().isoformat() + 'Z'
-            }), 500
+                'timestamp': now_iso()
+            }, 500
         
         # Check if analysis was successful
         if not analysis_result.get('success', False):
-            return jsonify({
+            return {
                 'error': 'Analysis incomplete',
                 'details': analysis_result.get('error', 'Analysis failed for unknown reason'),
                 'temperature': analysis_result.get('temperature', 30),  # Return safe default
                 'confidence': analysis_result.get('confidence', 0.1),
-                'timestamp': datetime.utcnow().isoformat() + 'Z'
-            }), 500
+                'timestamp': now_iso()
+            }, 500
         
         # Prepare successful response
         response_data = {
@@ -157,74 +235,223 @@ def analyze_audio():
             'transcript_length': analysis_result.get('transcript_length', 0)
         }
         
+        if 'cached' in analysis_result:
+            response_data['cached'] = analysis_result['cached']
+        
+        # Cache before the debug fields are added, so the transcript excerpt
+        # is never written to disk
+        if cache_key:
+            response_cache.set(cache_key, response_data)
+        
         # Optionally include additional analysis data (for debugging)
-        if app.config.get('DEBUG', False):
+        if Config.DEBUG:
+            audio_info = audio_processor.inspect_audio(processed_file_path)
+            logger.info(f"Audio info: {audio_info}")
+            
             response_data.update({
                 'topics': analysis_result.get('topics', []),
                 'emotional_indicators': analysis_result.get('emotional_indicators', []),
-                'audio_info': audio_info,
+                'audio_info': audio_info.to_dict() if audio_info else {},
                 'transcript': analysis_result.get('transcript', '')[:500]  # Truncated for debug
             })
         
         logger.info(f"Analysis completed successfully: temperature={response_data['temperature']}")
-        return jsonify(response_data)
+        return response_data, 200
+        
+    finally:
+        # Always clean up temporary files
+        for temp_file_path in temp_file_paths:
+            audio_processor.cleanup_file(temp_file_path)
+
+@celery.task(name='analyze_audio')
+def analyze_audio_task(file_path, cache_key=None):
+    """Celery task wrapping run_analysis; the worker must share UPLOAD_FOLDER."""
+    return run_analysis(file_path, cache_key)
+
+@app.before_request
+def reject_oversized_upload():
+    """Reject uploads from their Content-Length before any of the body is read."""
+    if request.endpoint == 'analyze_audio' and (request.content_length or 0) > MAX_FILE_SIZE_BYTES:
+        logger.warning(f"Rejected upload of {request.content_length} bytes from {request.remote_addr}")
+        return _error(413, 'file_too_large')
+
+@app.route('/health', methods=['GET'])
+def health_check():
+    """Simple health check endpoint."""
+    return jsonify({
+        'status': 'healthy',
+        'timestamp': now_iso(),
+        'version': '1.0.0'
+    })
+
+@app.route('/analyze-audio', methods=['POST'])
+def analyze_audio():
+    """
+    Main endpoint for analyzing audio and returning temperature score.
     
-    except RequestEntityTooLarge:
-        return jsonify({
-            'error': 'File too large',
-            'details': f'Maximum file size is {Config.MAX_FILE_SIZE_MB}MB',
-            'timestamp': datetime.utcnow().isoformat() + 'Z'
-        }), 413
+    Expects:
+        POST request with multipart/form-data containing 'audio' file
+    
+    Returns:
+        JSON response with temperature analysis
+    """
+    temp_file_path = None
     
+    try:
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Received audio analysis request from {request.remote_addr}")
+            logger.debug(f"Request headers: {dict(request.headers)}")
+            logger.debug(f"Content type: {request.content_type}")
+        
+        # Stream the upload straight to a temporary file, bypassing request.files
+        try:
+            upload = audio_processor.stream_upload(request.stream, request.headers)
+        except InvalidAudioFile as e:
+            logger.warning(f"Audio file rejected before upload: {str(e)}")
+            return _error(400, 'invalid_audio', str(e))
+        except ParseFailedException as e:
+            logger.warning(f"Failed to parse multipart upload: {str(e)}")
+            return _error(400, 'invalid_request')
+        temp_file_path = upload.path
+        
+        # Check if audio file is present
+        if upload.filename is None:
+            logger.warning("No audio file in request")
+            return _error(400, 'no_audio')
+        
+        logger.info(f"Received audio file: {upload.filename}, size: {upload.size}")
+        
+        # Validate the audio file
+        is_valid, error_message = audio_processor.validate_audio_file(upload, request.content_length)
+        if not is_valid:
+            logger.warning(f"Audio file validation failed: {error_message}")
+            return _error(400, 'invalid_audio', error_message)
+        
+        # Serve repeated uploads of the same audio from the response cache
+        cache_key = response_cache.make_key(upload.digest)
+        if request.args.get('no_cache') != '1':
+            cached_response = response_cache.get(cache_key)
+            if cached_response is not None:
+                logger.info(f"Serving cached analysis for {upload.filename}")
+                cached_response.update({
+                    'cached': True,
+                    'timestamp': now_iso()
+                })
+                return jsonify(cached_response)
+        
+        logger.info(f"Processing audio file: {upload.filename}")
+        
+        # Give the temporary file its proper extension
+        try:
+            temp_file_path = audio_processor.save_temporary_file(upload)
+        except Exception as e:
+            logger.error(f"Failed to save temporary file: {str(e)}")
+            return _error(500, 'file_processing')
+        
+        # Hand the file over to the analysis pipeline, which cleans it up
+        processing_file_path, temp_file_path = temp_file_path, None
+        
+        if not Config.CELERY_BROKER_URL:
+            response_data, status_code = run_analysis(processing_file_path, cache_key)
+            return jsonify(response_data), status_code
+        
+        # Queued uploads may wait longer than the orphan sweep allows for
+        # request files, so they're moved aside; jobs expire with their files
+        processing_file_path = audio_processor.move_to_queue_folder(processing_file_path)
+        task = analyze_audio_task.apply_async(
+            (processing_file_path, cache_key),
+            expires=Config.QUEUED_FILE_MAX_AGE_SECONDS
+        )
+        logger.info(f"Queued analysis job {task.id}")
+        
+        # Asynchronous callers poll /analyze-audio/<job_id> for the result
+        if request.args.get('async') == '1':
+            return jsonify({
+                'job_id': task.id,
+                'status': task.state,
+                'timestamp': now_iso()
+            }), 202
+        
+        response_data, status_code = task.get(timeout=Config.ANALYSIS_TIMEOUT_SECONDS)
+        return jsonify(response_data), status_code
+        
+    except RequestEntityTooLarge:
+        return _error(413, 'file_too_large')
+        
     except Exception as e:
         logger.error(f"Unexpected error: {str(e)}", exc_info=True)
-        return jsonify({
-            'error': 'Internal server error',
-            'details': 'An unexpected error occurred',
-            'timestamp': datetime.utcnow().isoformat() + 'Z'
-        }), 500
-    
+        return _error(500, 'unexpected')
+        
     finally:
         # Always clean up temporary files
         if temp_file_path:
             audio_processor.cleanup_file(temp_file_path)
 
+@app.route('/analyze-audio/<job_id>', methods=['GET'])
+def analyze_audio_result(job_id):
+    """
+    Fetch the result of an analysis queued with POST /analyze-audio?async=1.
+    
+    Returns:
+        202 with the job state while pending, otherwise the analysis response
+    """
+    if not Config.CELERY_BROKER_URL:
+        return _error(404, 'queue_disabled')
+    
+    result = AsyncResult(job_id, app=celery)
+    
+    if not result.ready():
+        return jsonify({
+            'job_id': job_id,
+            'status': result.state,
+            'timestamp': now_iso()
+        }), 202
+    
+    if result.failed():
+        logger.error(f"Analysis job {job_id} failed: {result.result}")
+        return _error(500, 'job_failed')
+    
+    response_data, status_code = result.get()
+    return jsonify(response_data), status_code
+
+if Config.DEBUG:
+    @app.route('/debug/pyspy', methods=['GET'])
+    def debug_pyspy():
+        """Dump the current stack of every thread in this process (debug mode only)."""
+        try:
+            output = subprocess.check_output(
+                ['py-spy', 'dump', '--pid', str(os.getpid())],
+                stderr=subprocess.STDOUT,
+                timeout=30
+            )
+        except FileNotFoundError:
+            return _error(503, 'profiler_unavailable', 'py-spy is not installed')
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+            logger.warning(f"py-spy dump failed: {str(e)}")
+            return _error(503, 'profiler_unavailable', 'py-spy dump failed')
+        return output, 200, {'Content-Type': 'text/plain; charset=utf-8'}
+
 @app.errorhandler(404)
 def not_found(error):
-    return jsonify({
-        'error': 'Endpoint not found',
-        'details': 'The requested endpoint does not exist',
-        'available_endpoints': ['/health', '/analyze-audio'],
-        'timestamp': datetime.utcnow().isoformat() + 'Z'
-    }), 404
+    return _error(404, 'not_found')
 
 @app.errorhandler(405)
 def method_not_allowed(error):
-    return jsonify({
-        'error': 'Method not allowed',
-        'details': 'The HTTP method is not allowed for this endpoint',
-        'timestamp': datetime.utcnow().isoformat() + 'Z'
-    }), 405
+    return _error(405, 'method_not_allowed')
 
 @app.errorhandler(500)
 def internal_error(error):
-    return jsonify({
-        'error': 'Internal server error',
-        'details': 'An unexpected server error occurred',
-        'timestamp': datetime.utcnow().isoformat() + 'Z'
-    }), 500
+    return _error(500, 'server_error')
 
 if __name__ == '__main__':
-    # Ensure upload directory exists
-    os.makedirs(Config.UPLOAD_FOLDER, exist_ok=True)
-    
     logger.info(f"Starting AI Room Temperature server on port {Config.PORT}")
     logger.info(f"Debug mode: {Config.DEBUG}")
     logger.info(f"Max file size: {Config.MAX_FILE_SIZE_MB}MB")
     logger.info(f"Allowed file types: {', '.join(Config.ALLOWED_EXTENSIONS)}")
     logger.info(f"CORS origins: {Config.CORS_ORIGINS}")
+    logger.warning("Running the Flask development server. For production use: gunicorn -c gunicorn.conf.py wsgi:application")
     
-    # Run the Flask app
+    # Run the Flask development server
     app.run(
         host='0.0.0.0',
         port=Config.PORT,
@@ -1,21 +1,218 @@
 import os
+import re
+import glob
+import json
+import time
+import hashlib
 import tempfile
 import logging
-from typing import Optional, Tuple
-from werkzeug.utils import secure_filename
+import threading
+import subprocess
+import uuid
+from dataclasses import asdict, dataclass
+from typing import List, Mapping, Optional, Tuple
+from werkzeug.exceptions import RequestEntityTooLarge
+import mutagen
 from pydub import AudioSegment
-from config import Config
+from streaming_form_data import StreamingFormDataParser
+from streaming_form_data.targets import FileTarget
+from config import Config, MAX_FILE_SIZE_BYTES, MAX_AUDIO_DURATION_SECONDS
+
+try:
+    import blake3
+except ImportError:  # Fall back to hashlib when the BLAKE3 wheel is unavailable
+    blake3 = None
+
+try:
+    import webrtcvad
+except ImportError:  # Silence detection is skipped without the VAD
+    webrtcvad = None
+
+try:
+    from line_profiler import profile
+except ImportError:  # Line profiling is a development-only tool
+    def profile(func):
+        return func
 
 logger = logging.getLogger(__name__)
 
+# Size of each read from the request body while streaming an upload
+UPLOAD_CHUNK_SIZE = 65536
+
+def _filename_pattern(field_name: str) -> re.Pattern:
+    """Matches the filename in a multipart field's Content-Disposition header."""
+    return re.compile(
+        rb'content-disposition:[^\r\n]*\bname="' + re.escape(field_name.encode()) +
+        rb'"[^\r\n]*\bfilename="([^"\r\n]*)"',
+        re.IGNORECASE
+    )
+
+# Precompiled for the audio field, which every upload is checked for
+_AUDIO_FILENAME_RE = _filename_pattern('audio')
+
+# Prefix of every file the app writes to the upload folder. The orphan sweep
+# only deletes files with it, since UPLOAD_FOLDER may be a shared directory.
+TEMP_FILE_PREFIX = 'room_temp_'
+
+# Uploads waiting for a background worker, kept apart from the upload folder's
+# short-lived files so the orphan sweep doesn't delete them
+QUEUE_FOLDER = os.path.join(Config.UPLOAD_FOLDER, 'queued')
+
+# Whisper resamples to 16kHz mono internally, so anything more is wasted upload
+TRANSCRIPTION_SAMPLE_RATE = 16000
+TRANSCRIPTION_CHANNELS = 1
+TRANSCRIPTION_BITRATE = '16k'
+
+# Voice activity detection runs on 30ms frames of 16-bit PCM, most aggressive mode
+VAD_FRAME_MS = 30
+VAD_AGGRESSIVENESS = 3
+
+# Bytes per sample for ffprobe's sample formats (planar variants included)
+SAMPLE_FORMAT_WIDTHS = {'u8': 1, 's16': 2, 's32': 4, 'flt': 4, 'dbl': 8, 's64': 8}
+
+# Formats whose duration mutagen can read from the file header
+MUTAGEN_EXTENSIONS = frozenset(['mp3', 'm4a', 'flac', 'ogg', 'wma'])
+
+class InvalidAudioFile(Exception):
+    """Raised when an upload is rejected from its multipart headers alone."""
+    pass
+
+@dataclass
+class UploadedAudio:
+    """An uploaded audio file that has already been streamed to disk."""
+    filename: Optional[str]
+    path: str
+    size: int
+    digest: Optional[str] = None  # "<algorithm>:<hex digest>" of the audio bytes
+
+def new_upload_hash():
+    """
+    Create the hash object used to fingerprint uploads (Config.HASH_ALGO).
+    
+    BLAKE3 is preferred since it is several times faster than SHA-256 on
+    multi-MB files; SHA-256 is used if the blake3 package is not installed.
+    """
+    if Config.HASH_ALGO == 'blake3':
+        return blake3.blake3() if blake3 is not None else hashlib.sha256()
+    return hashlib.new(Config.HASH_ALGO)
+
+class HashingFileTarget(FileTarget):
+    """FileTarget that hashes the bytes as they are written."""
+    
+    def __init__(self, filename, *args, **kwargs):
+        super().__init__(filename, *args, **kwargs)
+        self.hash = new_upload_hash()
+    
+    def on_data_received(self, chunk: bytes):
+        super().on_data_received(chunk)
+        self.hash.update(chunk)
+    
+    @property
+    def digest(self) -> str:
+        return f"{self.hash.name}:{self.hash.hexdigest()}"
+
+@dataclass
+class AudioInfo:
+    """Basic metadata about an audio file."""
+    duration_seconds: float
+    channels: int
+    frame_rate: int
+    sample_width: int
+    file_size_bytes: int
+    
+    def to_dict(self) -> dict:
+        return asdict(self)
+
 class AudioProcessor:
     """Handles audio file processing and validation."""
     
     @staticmethod
-    def validate_audio_file(file) -> Tuple[bool, Optional[str]]:
+    def peek_upload_filename(chunk: bytes, field_name: str = 'audio') -> Optional[str]:
+        """
+        Find the filename of a multipart field in the first chunk of the body.
+        
+        Only the part's Content-Disposition header is inspected, so an upload can
+        be rejected before the rest of the body is read.
+        
+        Returns:
+            The filename, or None if the field's headers are not in this chunk
+        """
+        pattern = _AUDIO_FILENAME_RE if field_name == 'audio' else _filename_pattern(field_name)
+        match = pattern.search(chunk)
+        return match.group(1).decode('utf-8', 'replace') if match else None
+    
+    @staticmethod
+    def stream_upload(stream, headers: Mapping[str, str], field_name: str = 'audio') -> UploadedAudio:
+        """
+        Stream a multipart/form-data request body straight into a temporary file.
+        
+        The body is read in chunks and only the bytes of the audio field are
+        written, so the upload is never buffered in memory or copied twice.
+        The size limit is enforced while reading, aborting as soon as it is
+        exceeded, and the audio bytes are hashed in the same pass. Uploads whose
+        filename has an unsupported extension are rejected from the first chunk.
+        
+        Returns:
+            UploadedAudio describing the temporary file (filename is None if the
+            request did not contain the audio field)
+        """
+        # Create upload directory if it doesn't exist
+        os.makedirs(Config.UPLOAD_FOLDER, exist_ok=True)
+        
+        temp_fd, temp_path = tempfile.mkstemp(prefix=TEMP_FILE_PREFIX, dir=Config.UPLOAD_FOLDER)
+        os.close(temp_fd)
+        
+        target = None
+        size = 0
+        
+        try:
+            target = HashingFileTarget(temp_path)
+            parser = StreamingFormDataParser(headers=headers)
+            parser.register(field_name, target)
+            
+            while True:
+                chunk = stream.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                
+                size += len(chunk)
+                if size > MAX_FILE_SIZE_BYTES:
+                    raise RequestEntityTooLarge()
+                
+                if size == len(chunk):
+                    filename = AudioProcessor.peek_upload_filename(chunk, field_name)
+                    if filename is not None:
+                        is_valid, error_message = AudioProcessor.validate_audio_file(
+                            UploadedAudio(filename=filename, path=temp_path, size=0)
+                        )
+                        if not is_valid:
+                            raise InvalidAudioFile(error_message)
+                
+                parser.data_received(chunk)
+            
+        except Exception:
+            # Clean up on error
+            if target is not None:
+                target.on_finish()
+            AudioProcessor.cleanup_file(temp_path)
+            raise
+        
+        logger.info(f"Streamed upload to temporary file: {temp_path} ({size} bytes)")
+        return UploadedAudio(
+            filename=target.multipart_filename,
+            path=temp_path,
+            size=size,
+            digest=target.digest
+        )
+    
+    @staticmethod
+    def validate_audio_file(file, content_length: Optional[int] = None) -> Tuple[bool, Optional[str]]:
         """
         Validate uploaded audio file.
         
+        The size is checked against the request's Content-Length rather than
+        by seeking through the file; MAX_CONTENT_LENGTH remains the backstop.
+        
         Returns:
             Tuple of (is_valid, error_message)
         """
@@ -28,68 +225,117 @@ class AudioProcessor:
         if not Config.is_allowed_file(file.filename):
             return False, f"Invalid file format. Supported formats: {', '.join(Config.ALLOWED_EXTENSIONS)}"
         
-        # Check file size (approximate, as we haven't saved it yet)
-        file.seek(0, 2)  # Seek to end
-        size = file.tell()
-        file.seek(0)  # Reset to beginning
-        
-        if size > Config.MAX_FILE_SIZE_BYTES:
+        if content_length is not None and content_length > MAX_FILE_SIZE_BYTES:
             return False, f"File too large. Maximum size: {Config.MAX_FILE_SIZE_MB}MB"
         
         return True, None
     
     @staticmethod
-    def save_temporary_file(file) -> str:
+    def save_temporary_file(upload: UploadedAudio) -> str:
         """
-        Save uploaded file to a temporary location.
+        Give a streamed upload its final temporary file name.
+        
+        The bytes are already on disk, so this only renames the file to
+        carry the extension used for audio format detection.
         
         Returns:
             Path to temporary file
         """
-        # Create upload directory if it doesn't exist
-        os.makedirs(Config.UPLOAD_FOLDER, exist_ok=True)
+        # Rename temporary file to have the proper (already validated) extension
+        suffix = f".{Config.file_extension(upload.filename)}"
+        temp_path = upload.path + suffix
+        os.replace(upload.path, temp_path)
+        upload.path = temp_path
+        
+        logger.info(f"Saved temporary audio file: {temp_path}")
+        return temp_path
+    
+    @staticmethod
+    def _ffprobe_duration(file_path: str) -> float:
+        """
+        Read the audio duration from the container header with ffprobe.
+        """
+        result = subprocess.run(
+            ['ffprobe', '-v', 'error', '-show_entries', 'format=duration',
+             '-of', 'default=nw=1:nk=1', file_path],
+            capture_output=True,
+            check=True
+        )
+        duration = result.stdout.strip()
+        if duration and duration != b'N/A':
+            return float(duration)
         
-        # Create secure filename
-        filename = secure_filename(file.filename)
+        # MediaRecorder WebM has no duration in its header
+        return AudioProcessor._ffprobe_packet_duration(file_path)
+    
+    @staticmethod
+    def _ffprobe_packet_duration(file_path: str) -> float:
+        """
+        Read the audio duration from the end of the last audio packet.
         
-        # Create temporary file with proper extension
-        suffix = f".{filename.rsplit('.', 1)[1].lower()}"
-        temp_fd, temp_path = tempfile.mkstemp(
-            suffix=suffix,
-            dir=Config.UPLOAD_FOLDER
+        For containers without a duration in their header. ffprobe demuxes
+        the packets but does not decode them.
+        """
+        result = subprocess.run(
+            ['ffprobe', '-v', 'error', '-select_streams', 'a:0',
+             '-show_entries', 'packet=pts_time,duration_time', '-of', 'csv=p=0', file_path],
+            capture_output=True,
+            check=True
         )
+        end = 0.0
+        for line in result.stdout.splitlines():
+            pts_time, _, duration_time = line.partition(b',')
+            if not pts_time or pts_time == b'N/A':
+                continue
+            packet_end = float(pts_time)
+            if duration_time and duration_time != b'N/A':
+                packet_end += float(duration_time)
+            end = max(end, packet_end)
+        
+        if end <= 0:
+            raise ValueError("No timestamped audio packets found")
+        return end
+    
+    @staticmethod
+    def probe_duration(file_path: str) -> float:
+        """
+        Get the audio duration in seconds without decoding the audio.
+        
+        Uses mutagen for formats with a duration in their header and ffprobe
+        for the rest. Falls back to a full pydub decode only if both fail.
+        
+        Returns:
+            Duration in seconds
+        """
+        extension = Config.file_extension(file_path)
         
         try:
-            # Save file to temporary location
-            with os.fdopen(temp_fd, 'wb') as tmp_file:
-                file.save(tmp_file)
+            if extension in MUTAGEN_EXTENSIONS:
+                audio = mutagen.File(file_path)
+                if audio is not None and audio.info.length:
+                    return float(audio.info.length)
             
-            logger.info(f"Saved temporary audio file: {temp_path}")
-            return temp_path
+            return AudioProcessor._ffprobe_duration(file_path)
             
         except Exception as e:
-            # Clean up on error
-            try:
-                os.close(temp_fd)
-                os.unlink(temp_path)
-            except:
-                pass
-            raise e
+            logger.warning(f"Header duration probe failed, decoding audio instead: {str(e)}")
+            audio = AudioSegment.from_file(file_path)
+            return len(audio) / 1000.0  # Convert milliseconds to seconds
     
     @staticmethod
+    @profile
     def validate_audio_duration(file_path: str) -> Tuple[bool, Optional[str], Optional[float]]:
         """
-        Validate audio duration using pydub.
+        Validate audio duration from the file header, without decoding the audio.
         
         Returns:
             Tuple of (is_valid, error_message, duration_seconds)
         """
         try:
-            audio = AudioSegment.from_file(file_path)
-            duration_seconds = len(audio) / 1000.0  # Convert milliseconds to seconds
+            duration_seconds = AudioProcessor.probe_duration(file_path)
             
-            if duration_seconds > Config.MAX_AUDIO_DURATION_SECONDS:
-                return False, f"Audio too long. Maximum duration: {Config.MAX_AUDIO_DURATION_SECONDS} seconds", duration_seconds
+            if duration_seconds > MAX_AUDIO_DURATION_SECONDS:
+                return False, f"Audio too long. Maximum duration: {MAX_AUDIO_DURATION_SECONDS} seconds", duration_seconds
             
             if duration_seconds < 1:
                 return False, "Audio too short. Minimum duration: 1 second", duration_seconds
@@ -101,6 +347,95 @@ class AudioProcessor:
             logger.error(f"Error validating audio duration: {str(e)}")
             return False, f"Invalid audio file: {str(e)}", None
     
+    @staticmethod
+    def check_upload_folder_space() -> int:
+        """
+        Check the upload folder has room for the expected concurrent uploads.
+        
+        Each request may hold the upload and a transcoded copy, so at least
+        2 * MAX_FILE_SIZE_BYTES * EXPECTED_CONCURRENCY bytes must be free.
+        
+        Returns:
+            Free space in bytes
+        """
+        os.makedirs(Config.UPLOAD_FOLDER, exist_ok=True)
+        
+        stats = os.statvfs(Config.UPLOAD_FOLDER)
+        free_bytes = stats.f_bavail * stats.f_frsize
+        required_bytes = 2 * Config.MAX_FILE_SIZE_BYTES * Config.EXPECTED_CONCURRENCY
+        
+        logger.info(f"Upload folder {Config.UPLOAD_FOLDER}: {free_bytes / 1024 / 1024:.0f}MB free")
+        
+        if free_bytes < required_bytes:
+            raise RuntimeError(
+                f"Upload folder {Config.UPLOAD_FOLDER} has {free_bytes / 1024 / 1024:.0f}MB free, "
+                f"but {required_bytes / 1024 / 1024:.0f}MB is required for {Config.EXPECTED_CONCURRENCY} concurrent uploads"
+            )
+        
+        return free_bytes
+    
+    @staticmethod
+    def sweep_orphan_files(max_age_seconds: int, directory: Optional[str] = None) -> int:
+        """
+        Delete upload files that outlived their request (e.g. after a crash).
+        
+        Only files the app wrote (named with TEMP_FILE_PREFIX) directly in the
+        directory (the upload folder by default) are considered, so the cache
+        and queue directories and any unrelated files are left alone.
+        
+        Returns:
+            Number of files deleted
+        """
+        cutoff = time.time() - max_age_seconds
+        deleted = 0
+        
+        try:
+            with os.scandir(directory or Config.UPLOAD_FOLDER) as entries:
+                for entry in entries:
+                    if (entry.name.startswith(TEMP_FILE_PREFIX) and entry.is_file(follow_symlinks=False)
+                            and entry.stat().st_mtime < cutoff):
+                        AudioProcessor.cleanup_file(entry.path)
+                        deleted += 1
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"Error sweeping upload folder: {str(e)}")
+        
+        if deleted:
+            logger.warning(f"Deleted {deleted} orphaned upload file(s)")
+        return deleted
+    
+    @staticmethod
+    def start_orphan_sweeper() -> threading.Timer:
+        """
+        Sweep the upload folder for orphaned files every ORPHAN_SWEEP_INTERVAL_SECONDS.
+        
+        Uploads handed to the background queue may wait longer than a request,
+        so the queue folder is swept with QUEUED_FILE_MAX_AGE_SECONDS instead.
+        """
+        def sweep():
+            AudioProcessor.sweep_orphan_files(Config.ORPHAN_FILE_MAX_AGE_SECONDS)
+            AudioProcessor.sweep_orphan_files(Config.QUEUED_FILE_MAX_AGE_SECONDS, QUEUE_FOLDER)
+            AudioProcessor.start_orphan_sweeper()
+        
+        timer = threading.Timer(Config.ORPHAN_SWEEP_INTERVAL_SECONDS, sweep)
+        timer.daemon = True
+        timer.start()
+        return timer
+    
+    @staticmethod
+    def move_to_queue_folder(file_path: str) -> str:
+        """
+        Move an upload handed to the background queue into the queue folder.
+        
+        Returns:
+            The new path of the file
+        """
+        os.makedirs(QUEUE_FOLDER, exist_ok=True)
+        queued_path = os.path.join(QUEUE_FOLDER, os.path.basename(file_path))
+        os.replace(file_path, queued_path)
+        return queued_path
+    
     @staticmethod
     def cleanup_file(file_path: str) -> None:
         """
@@ -114,53 +449,180 @@ class AudioProcessor:
             logger.error(f"Error cleaning up file {file_path}: {str(e)}")
     
     @staticmethod
+    def _ffprobe_audio_info(file_path: str) -> AudioInfo:
+        """
+        Read audio stream metadata from the file header with ffprobe.
+        
+        Raises if ffprobe fails or the file has no audio stream, which makes
+        this a cheap validity check as well.
+        """
+        result = subprocess.run(
+            ['ffprobe', '-v', 'error', '-select_streams', 'a:0',
+             '-show_streams', '-show_format', '-of', 'json', file_path],
+            capture_output=True,
+            check=True
+        )
+        data = json.loads(result.stdout)
+        
+        if not data.get('streams'):
+            raise ValueError("No audio stream found")
+        
+        stream = data['streams'][0]
+        sample_format = stream.get('sample_fmt', '').rstrip('p')
+        
+        return AudioInfo(
+            duration_seconds=float(data['format'].get('duration') or stream.get('duration') or 0),
+            channels=int(stream.get('channels', 0)),
+            frame_rate=int(stream.get('sample_rate', 0)),
+            sample_width=SAMPLE_FORMAT_WIDTHS.get(sample_format, 2),
+            file_size_bytes=os.path.getsize(file_path)
+        )
+    
+    @staticmethod
+    @profile
     def prepare_audio_for_transcription(file_path: str) -> str:
         """
         Prepare audio file for OpenAI Whisper transcription.
-        This can include format conversion, normalization, etc.
         
-        For now, we'll return the file as-is since OpenAI Whisper
-        supports multiple formats.
+        Transcodes the audio to 16kHz mono Opus with ffmpeg, which Whisper
+        resamples to anyway, so far fewer bytes are uploaded to OpenAI.
+        Files that are already 16kHz mono are used as-is, as is the original
+        file if transcoding fails.
         
         Returns:
-            Path to prepared audio file
+            Path to prepared audio file (a new temporary file when transcoded,
+            which the caller must clean up)
         """
         try:
-            # Validate the audio file can be loaded
-            audio = AudioSegment.from_file(file_path)
-            
-            # For now, return original file
-            # In the future, we might want to:
-            # - Convert to a standard format (e.g., WAV)
-            # - Normalize audio levels
-            # - Remove silence
-            # - Apply noise reduction
-            
-            return file_path
-            
+            # Validate the file has an audio stream
+            audio_info = AudioProcessor._ffprobe_audio_info(file_path)
         except Exception as e:
             logger.error(f"Error preparing audio for transcription: {str(e)}")
             raise Exception(f"Cannot process audio file: {str(e)}")
+        
+        if audio_info.frame_rate == TRANSCRIPTION_SAMPLE_RATE and audio_info.channels == TRANSCRIPTION_CHANNELS:
+            return file_path
+        
+        temp_fd, output_path = tempfile.mkstemp(suffix='.ogg', prefix=TEMP_FILE_PREFIX, dir=Config.UPLOAD_FOLDER)
+        os.close(temp_fd)
+        
+        try:
+            subprocess.run(
+                ['ffmpeg', '-y', '-v', 'error', '-i', file_path,
+                 '-ac', str(TRANSCRIPTION_CHANNELS), '-ar', str(TRANSCRIPTION_SAMPLE_RATE),
+                 '-c:a', 'libopus', '-b:a', TRANSCRIPTION_BITRATE, '-f', 'ogg', output_path],
+                capture_output=True,
+                check=True
+            )
+            
+            logger.info(f"Transcoded audio for transcription: {os.path.getsize(file_path)} -> {os.path.getsize(output_path)} bytes")
+            return output_path
+            
+        except Exception as e:
+            logger.warning(f"Transcoding failed, using original audio: {str(e)}")
+            AudioProcessor.cleanup_file(output_path)
+            return file_path
     
     @staticmethod
-    def get_audio_info(file_path: str) -> dict:
+    def split_audio(file_path: str, segment_seconds: int) -> List[str]:
+        """
+        Split audio into consecutive segments for separate transcription.
+        
+        Segments are transcoded to the same 16kHz mono Opus as
+        prepare_audio_for_transcription.
+        
+        Returns:
+            Paths of the segment files in order, which the caller must clean up
+        """
+        prefix = os.path.join(Config.UPLOAD_FOLDER, f"{TEMP_FILE_PREFIX}{uuid.uuid4().hex}_")
+        
+        try:
+            subprocess.run(
+                ['ffmpeg', '-y', '-v', 'error', '-i', file_path,
+                 '-ac', str(TRANSCRIPTION_CHANNELS), '-ar', str(TRANSCRIPTION_SAMPLE_RATE),
+                 '-c:a', 'libopus', '-b:a', TRANSCRIPTION_BITRATE,
+                 '-f', 'segment', '-segment_time', str(segment_seconds), '-reset_timestamps', '1',
+                 prefix + '%03d.ogg'],
+                capture_output=True,
+                check=True
+            )
+        except Exception:
+            for segment_path in glob.glob(prefix + '*'):
+                AudioProcessor.cleanup_file(segment_path)
+            raise
+        
+        segment_paths = sorted(glob.glob(prefix + '*.ogg'))
+        logger.info(f"Split audio into {len(segment_paths)} segments of up to {segment_seconds} seconds")
+        return segment_paths
+    
+    @staticmethod
+    @profile
+    def inspect_audio(file_path: str) -> Optional[AudioInfo]:
         """
         Extract basic information about the audio file.
         
+        Reads the file header with ffprobe, falling back to decoding the
+        audio with pydub only if that fails.
+        
         Returns:
-            Dictionary with audio metadata
+            AudioInfo with audio metadata, or None if the file cannot be read
         """
+        try:
+            return AudioProcessor._ffprobe_audio_info(file_path)
+        except Exception as e:
+            logger.warning(f"Header probe failed, decoding audio instead: {str(e)}")
+        
         try:
             audio = AudioSegment.from_file(file_path)
             
-            return {
-                'duration_seconds': len(audio) / 1000.0,
-                'channels': audio.channels,
-                'frame_rate': audio.frame_rate,
-                'sample_width': audio.sample_width,
-                'file_size_bytes': os.path.getsize(file_path)
-            }
+            return AudioInfo(
+                duration_seconds=len(audio) / 1000.0,
+                channels=audio.channels,
+                frame_rate=audio.frame_rate,
+                sample_width=audio.sample_width,
+                file_size_bytes=os.path.getsize(file_path)
+            )
             
         except Exception as e:
             logger.error(f"Error getting audio info: {str(e)}")
-            return {}
\ No newline at end of file
+            return None
+    
+    @staticmethod
+    @profile
+    def speech_ratio(file_path: str) -> Optional[float]:
+        """
+        Measure how much of the audio contains speech.
+        
+        Decodes the audio to 16kHz mono PCM with ffmpeg and runs each 30ms
+        frame through webrtcvad.
+        
+        Returns:
+            Fraction of frames containing speech, or None if webrtcvad isn't
+            installed or the audio cannot be decoded
+        """
+        if webrtcvad is None:
+            return None
+        
+        try:
+            result = subprocess.run(
+                ['ffmpeg', '-v', 'error', '-i', file_path,
+                 '-ac', '1', '-ar', str(TRANSCRIPTION_SAMPLE_RATE), '-f', 's16le', '-'],
+                capture_output=True,
+                check=True
+            )
+        except Exception as e:
+            logger.warning(f"Could not decode audio for speech detection: {str(e)}")
+            return None
+        
+        pcm = result.stdout
+        frame_bytes = TRANSCRIPTION_SAMPLE_RATE * VAD_FRAME_MS // 1000 * 2
+        frame_count = len(pcm) // frame_bytes
+        if frame_count == 0:
+            return 0.0
+        
+        vad = webrtcvad.Vad(VAD_AGGRESSIVENESS)
+        speech_frames = sum(
+            1 for offset in range(0, frame_count * frame_bytes, frame_bytes)
+            if vad.is_speech(pcm[offset:offset + frame_bytes], TRANSCRIPTION_SAMPLE_RATE)
+        )
+        return speech_frames / frame_count
\ No newline at end of file
@@ -0,0 +1,148 @@
+import os
+import uuid
+import tempfile
+import logging
+from typing import Dict, List, Optional
+import orjson
+from diskcache import Cache
+from config import Config
+from temperature_analyzer import TemperatureAnalyzer, PROMPT_VERSION
+
+logger = logging.getLogger(__name__)
+
+# Batch states in which results are not available yet
+PENDING_BATCH_STATUSES = frozenset(['validating', 'in_progress', 'finalizing', 'cancelling'])
+
+# Canned results for short transcripts, which are never sent to OpenAI, are
+# kept on local disk until the batch is polled
+CANNED_RESULTS_TTL_SECONDS = 7 * 24 * 60 * 60
+
+# Id given to submissions in which every transcript was short, so no batch
+# was created
+LOCAL_BATCH_PREFIX = 'local_'
+
+class BatchAnalyzer:
+    """
+    Temperature analysis of transcripts through the OpenAI Batch API.
+    
+    For offline jobs that don't need an answer right away: batched requests
+    cost about half as much and have much higher rate limits, but complete
+    within 24 hours rather than seconds. Each transcript is sent as the same
+    chat request the interactive path makes, except that transcripts too
+    short to analyze get the same canned results as on the interactive path.
+    Those are stored locally, so a batch must be polled on the machine that
+    submitted it.
+    """
+    
+    def __init__(self, directory: Optional[str] = None):
+        self.client = TemperatureAnalyzer.client
+        self._canned = Cache(directory or os.path.join(Config.UPLOAD_FOLDER, 'batches'))
+    
+    def submit(self, transcripts: List[str]) -> str:
+        """
+        Queue transcripts for analysis.
+        
+        Returns:
+            The batch id to pass to poll()
+        """
+        lines = []
+        canned = {}
+        for index, transcript in enumerate(transcripts):
+            transcript = transcript.strip() if transcript else ""
+            short_result = TemperatureAnalyzer.short_transcript_result(transcript)
+            if short_result is not None:
+                canned[index] = short_result
+                continue
+            
+            lines.append(orjson.dumps({
+                # The transcript length rides along for the result's transcript_length
+                'custom_id': f"t{index}-{len(transcript)}",
+                'method': 'POST',
+                'url': '/v1/chat/completions',
+                'body': TemperatureAnalyzer.analysis_request_body(transcript)
+            }))
+        
+        if lines:
+            batch_id = self._create_batch(lines, len(transcripts))
+        else:
+            batch_id = f"{LOCAL_BATCH_PREFIX}{uuid.uuid4().hex}"
+        
+        if canned:
+            self._canned.set(batch_id, canned, expire=CANNED_RESULTS_TTL_SECONDS)
+        
+        logger.info(f"Submitted analysis batch {batch_id} with {len(lines)} of {len(transcripts)} transcripts")
+        return batch_id
+    
+    def _create_batch(self, lines: List[bytes], count: int) -> str:
+        with tempfile.TemporaryFile(dir=Config.UPLOAD_FOLDER) as requests_file:
+            requests_file.write(b'\n'.join(lines))
+            requests_file.seek(0)
+            input_file = self.client.files.create(
+                file=('requests.jsonl', requests_file, 'application/jsonl'),
+                purpose='batch'
+            )
+        
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint='/v1/chat/completions',
+            completion_window='24h',
+            metadata={'count': str(count), 'prompt_version': PROMPT_VERSION}
+        )
+        return batch.id
+    
+    def poll(self, batch_id: str) -> Optional[List[Dict]]:
+        """
+        Fetch the results of a submitted batch.
+        
+        Batches that expired or were cancelled return their partial results;
+        transcripts without a result get a failed analysis result.
+        
+        Returns:
+            Analysis results in the order the transcripts were submitted, or
+            None if the batch is still running
+        """
+        canned = self._canned.get(batch_id, {})
+        if batch_id.startswith(LOCAL_BATCH_PREFIX):
+            if not canned:
+                raise ValueError(f"Unknown or expired batch {batch_id}")
+            return [canned[index] for index in range(len(canned))]
+        
+        batch = self.client.batches.retrieve(batch_id)
+        if batch.status in PENDING_BATCH_STATUSES:
+            logger.info(f"Analysis batch {batch_id} is {batch.status}")
+            return None
+        
+        count = int((batch.metadata or {}).get('count') or batch.request_counts.total)
+        results: List[Optional[Dict]] = [canned.get(index) for index in range(count)]
+        
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for line in self.client.files.content(file_id).iter_lines():
+                if line:
+                    index, result = self._parse_result_line(line)
+                    results[index] = result
+        
+        missing_error = Exception(f"No result returned (batch {batch.status})")
+        return [result if result is not None else TemperatureAnalyzer.analysis_error_result(missing_error) for result in results]
+    
+    def _parse_result_line(self, line: str):
+        """
+        Turn one line of a batch output or error file into (index, result).
+        """
+        item = orjson.loads(line)
+        index, transcript_length = (int(part) for part in item['custom_id'][1:].split('-'))
+        
+        response = item.get('response') or {}
+        if item.get('error') or response.get('status_code') != 200:
+            error = item.get('error') or (response.get('body') or {}).get('error') or {}
+            return index, TemperatureAnalyzer.analysis_error_result(Exception(error.get('message', 'Batch request failed')))
+        
+        content = response['body']['choices'][0]['message'].get('content') or ''
+        try:
+            result = TemperatureAnalyzer.parse_analysis_response(content, '')
+        except Exception as e:
+            return index, TemperatureAnalyzer.analysis_error_result(e)
+        
+        result['transcript_length'] = transcript_length
+        return index, result
\ No newline at end of file
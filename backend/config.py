@@ -1,4 +1,9 @@
 import os
+import re
+import hashlib
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional, Tuple
 from dotenv import load_dotenv
 
 # Load .env file from the parent directory (project root)
@@ -6,39 +11,139 @@ load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '..', '.env'))
 # Also try loading from current directory as fallback
 load_dotenv()
 
-class Config:
+# Supported audio formats
+ALLOWED_EXTENSIONS = frozenset([
+    'wav', 'mp3', 'm4a', 'flac', 'ogg', 'aac', 'wma', 'webm'
+])
+
+# Precompiled filename extension parser for the per-upload checks
+_EXT_RE = re.compile(r'\.([A-Za-z0-9]{1,5})$')
+
+@dataclass(frozen=True, slots=True)
+class _Config:
+    """
+    Application settings, read from the environment once at import.
+    
+    Use the module-level Config instance rather than creating new ones.
+    """
     # OpenAI Configuration
-    OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
-    if not OPENAI_API_KEY:
-        raise ValueError("OPENAI_API_KEY environment variable is required")
+    OPENAI_API_KEY: Optional[str] = os.getenv('OPENAI_API_KEY')
     
     # Server Configuration
-    PORT = int(os.getenv('PORT', 5000))
-    DEBUG = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
+    PORT: int = int(os.getenv('PORT', 5000))
+    DEBUG: bool = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
     
     # Audio Processing Configuration
-    MAX_FILE_SIZE_MB = int(os.getenv('MAX_FILE_SIZE', 25))
-    MAX_FILE_SIZE_BYTES = MAX_FILE_SIZE_MB * 1024 * 1024
+    MAX_FILE_SIZE_MB: int = int(os.getenv('MAX_FILE_SIZE', 25))
+    MAX_FILE_SIZE_BYTES: int = MAX_FILE_SIZE_MB * 1024 * 1024
     
     # Supported audio formats
-    ALLOWED_EXTENSIONS = set([
-        'wav', 'mp3', 'm4a', 'flac', 'ogg', 'aac', 'wma', 'webm'
-    ])
+    ALLOWED_EXTENSIONS: frozenset = ALLOWED_EXTENSIONS
     
     # Processing limits
-    MAX_AUDIO_DURATION_SECONDS = 300  # 5 minutes
+    MAX_AUDIO_DURATION_SECONDS: int = 300  # 5 minutes
     
     # CORS settings
-    CORS_ORIGINS = os.getenv('CORS_ORIGINS', '*').split(',')
+    CORS_ORIGINS: Tuple[str, ...] = tuple(os.getenv('CORS_ORIGINS', '*').split(','))
+    
+    # Temporary file settings. Defaults to a disk-backed directory: /tmp is
+    # often a RAM-backed tmpfs, where concurrent uploads can exhaust memory.
+    UPLOAD_FOLDER: str = os.getenv('UPLOAD_FOLDER', '/var/lib/audio_uploads')
+    
+    # Startup requires free space for two files of maximum size per concurrent request
+    EXPECTED_CONCURRENCY: int = int(os.getenv('EXPECTED_CONCURRENCY', 4))
+    
+    # Leftover upload files older than this are deleted by a periodic sweep
+    ORPHAN_FILE_MAX_AGE_SECONDS: int = int(os.getenv('ORPHAN_FILE_MAX_AGE', 600))
+    ORPHAN_SWEEP_INTERVAL_SECONDS: int = 60
+    
+    # Uploads waiting in the background queue are kept this long; queued jobs
+    # expire after the same time
+    QUEUED_FILE_MAX_AGE_SECONDS: int = int(os.getenv('QUEUED_FILE_MAX_AGE', 24 * 60 * 60))
+    
+    # Background analysis queue (Celery). Analysis runs in the request
+    # handler when no broker is configured.
+    CELERY_BROKER_URL: Optional[str] = os.getenv('CELERY_BROKER_URL')
+    CELERY_RESULT_BACKEND: Optional[str] = os.getenv('CELERY_RESULT_BACKEND', CELERY_BROKER_URL)
+    ANALYSIS_TIMEOUT_SECONDS: int = int(os.getenv('ANALYSIS_TIMEOUT', 120))
+    
+    # Files analyzed concurrently by TemperatureAnalyzer.analyze_audio_files_batch
+    BATCH_CONCURRENCY: int = int(os.getenv('BATCH_CONCURRENCY', 8))
+    
+    # OpenAI account rate limits that async GPT requests are paced to
+    OPENAI_RPM: int = int(os.getenv('OPENAI_RPM', 3500))
+    OPENAI_TPM: int = int(os.getenv('OPENAI_TPM', 200000))
+    
+    # Per-request cProfile output (PROFILE=1), for finding hotspots
+    PROFILE: bool = os.getenv('PROFILE', '0') == '1'
+    PROFILE_DIR: str = os.getenv('PROFILE_DIR', '/tmp/profiles')
     
-    # Temporary file settings
-    UPLOAD_FOLDER = '/tmp/audio_uploads'
+    # Hash used to fingerprint uploads for the response cache
+    # ('blake3', or any hashlib algorithm such as 'sha256')
+    HASH_ALGO: str = os.getenv('HASH_ALGO', 'blake3').lower()
+    
+    # Cache of analysis responses for identical audio (0 disables)
+    RESPONSE_CACHE_TTL_SECONDS: int = int(os.getenv('RESPONSE_CACHE_TTL', 7 * 24 * 60 * 60))
+    
+    # Reuse GPT results for transcripts at least this similar (cosine similarity)
+    SEMANTIC_CACHE_ENABLED: bool = os.getenv('SEMANTIC_CACHE_ENABLED', 'True').lower() == 'true'
+    SEMANTIC_CACHE_THRESHOLD: float = float(os.getenv('SEMANTIC_CACHE_THRESHOLD', 0.95))
+    
+    # Cache of GPT responses for identical analysis requests (0 disables). Kept
+    # in process memory, or in Redis when REDIS_URL is set.
+    LLM_CACHE_TTL_SECONDS: int = int(os.getenv('LLM_CACHE_TTL', 24 * 60 * 60))
+    LLM_CACHE_MAX_ENTRIES: int = int(os.getenv('LLM_CACHE_MAX_ENTRIES', 1024))
+    REDIS_URL: Optional[str] = os.getenv('REDIS_URL')
+    
+    # Audio with less than this fraction of speech frames skips transcription
+    # (requires webrtcvad; 0 disables)
+    VAD_MIN_SPEECH_RATIO: float = float(os.getenv('VAD_MIN_SPEECH_RATIO', 0.02))
+    
+    # Longer audio is split into segments of this length and transcribed in parallel
+    WHISPER_CHUNK_SECONDS: int = int(os.getenv('WHISPER_CHUNK_SECONDS', 600))
+    
+    # Transcription backend: 'openai' (Whisper API) or 'local' (faster-whisper
+    # on this machine, requires faster-whisper and normally a CUDA GPU)
+    TRANSCRIBER_BACKEND: str = os.getenv('TRANSCRIBER_BACKEND', 'openai').lower()
+    LOCAL_WHISPER_MODEL: str = os.getenv('LOCAL_WHISPER_MODEL', 'large-v3')
+    LOCAL_WHISPER_DEVICE: str = os.getenv('LOCAL_WHISPER_DEVICE', 'cuda')
+    LOCAL_WHISPER_COMPUTE_TYPE: str = os.getenv('LOCAL_WHISPER_COMPUTE_TYPE', 'float16')
+    LOCAL_WHISPER_BATCH_SIZE: int = int(os.getenv('LOCAL_WHISPER_BATCH_SIZE', 16))
+    LOCAL_WHISPER_WORKERS: int = int(os.getenv('LOCAL_WHISPER_WORKERS', 2))
     
     # OpenAI model settings
-    WHISPER_MODEL = 'whisper-1'
-    GPT_MODEL = 'gpt-3.5-turbo'
+    WHISPER_MODEL: str = 'whisper-1'
+    GPT_MODEL: str = 'gpt-3.5-turbo'
+    GPT_CONTEXT_LIMIT: int = 16385
+    GPT_MAX_OUTPUT_TOKENS: int = 4096
+    EMBEDDING_MODEL: str = 'text-embedding-3-small'
+    
+    def __post_init__(self):
+        if not self.OPENAI_API_KEY:
+            raise ValueError("OPENAI_API_KEY environment variable is required")
+        # Checked here rather than on the first upload, where every request would
+        # fail (variable-length hashes such as shake_128 can't give a hexdigest)
+        if self.HASH_ALGO != 'blake3':
+            try:
+                hashlib.new(self.HASH_ALGO).hexdigest()
+            except (ValueError, TypeError):
+                raise ValueError(f"HASH_ALGO must be 'blake3' or a hashlib algorithm, not '{self.HASH_ALGO}'")
+    
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def file_extension(filename):
+        m = _EXT_RE.search(filename)
+        return m.group(1).lower() if m else None
     
     @staticmethod
+    @lru_cache(maxsize=1024)
     def is_allowed_file(filename):
-        return '.' in filename and \
-               filename.rsplit('.', 1)[1].lower() in Config.ALLOWED_EXTENSIONS
\ No newline at end of file
+        return _Config.file_extension(filename) in ALLOWED_EXTENSIONS
+
+# Single settings instance; `Config` is kept as the name importers already use
+CFG = _Config()
+Config = CFG
+
+# Hot-path constants for importers to bind locally
+MAX_FILE_SIZE_BYTES = CFG.MAX_FILE_SIZE_BYTES
+MAX_AUDIO_DURATION_SECONDS = CFG.MAX_AUDIO_DURATION_SECONDS
\ No newline at end of file
@@ -0,0 +1,29 @@
+"""
+Gunicorn configuration for the AI Room Temperature backend.
+
+Most of a request's time is spent waiting on the OpenAI API, so threaded
+workers let many uploads and analyses be in flight per process.
+
+Run with:
+    gunicorn -c gunicorn.conf.py wsgi:application
+"""
+
+import os
+import multiprocessing
+
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '5000')}"
+
+worker_class = 'gthread'
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count()))
+threads = int(os.getenv('GUNICORN_THREADS', 16))
+
+# Load the app once in the master so workers fork with the analyzer and its
+# (still unused) HTTP connection pool already set up
+preload_app = True
+
+# Whisper + GPT round-trips can take a while for long clips
+timeout = 120
+
+# Keep worker heartbeat files in memory to avoid stalls on a busy disk
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
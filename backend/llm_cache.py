@@ -0,0 +1,131 @@
+import json
+import asyncio
+import hashlib
+import logging
+import threading
+from typing import Optional
+from cachetools import TTLCache
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class LLMCache:
+    """
+    Cache of raw GPT analysis responses keyed on the exact request.
+    
+    Keys hash the model, prompts and sampling temperature, so only identical
+    requests share an entry. Entries live in an in-process TTL cache, or in
+    Redis when REDIS_URL is set so they are shared between workers. Async
+    callers use aget and aset, which talk to Redis through redis.asyncio so
+    the event loop isn't blocked on the round trip.
+    """
+    
+    def __init__(self, ttl_seconds: Optional[int] = None, max_entries: Optional[int] = None,
+                 redis_url: Optional[str] = None):
+        self.ttl_seconds = Config.LLM_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.max_entries = Config.LLM_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        self.redis_url = Config.REDIS_URL if redis_url is None else redis_url
+        self._redis = None
+        self._aredis = None
+        self._aredis_loop = None
+        self._memory = None
+        self._lock = threading.Lock()
+        
+        if not self.enabled:
+            return
+        if self.redis_url:
+            import redis
+            self._redis = redis.Redis.from_url(self.redis_url)
+        else:
+            self._memory = TTLCache(maxsize=self.max_entries, ttl=self.ttl_seconds)
+    
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+    
+    @staticmethod
+    def make_key(model: str, system_prompt: str, user_prompt: str, temperature: float) -> str:
+        """
+        Build the cache key for a chat completion request.
+        """
+        request = json.dumps({
+            'm': model,
+            'sp': system_prompt,
+            'u': user_prompt,
+            't': temperature
+        }, sort_keys=True)
+        return 'llm:' + hashlib.sha256(request.encode('utf-8')).hexdigest()
+    
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response.
+        
+        Returns:
+            The cached response text, or None on a miss
+        """
+        if not self.enabled:
+            return None
+        
+        try:
+            if self._redis is not None:
+                value = self._redis.get(key)
+                return value.decode('utf-8') if value is not None else None
+            with self._lock:
+                return self._memory.get(key)
+        except Exception as e:
+            logger.warning(f"LLM cache lookup failed: {str(e)}")
+            return None
+    
+    def set(self, key: str, value: str) -> None:
+        """
+        Store a response for ttl_seconds.
+        """
+        if not self.enabled:
+            return
+        
+        try:
+            if self._redis is not None:
+                self._redis.set(key, value.encode('utf-8'), ex=self.ttl_seconds)
+                return
+            with self._lock:
+                self._memory[key] = value
+        except Exception as e:
+            logger.warning(f"LLM cache store failed: {str(e)}")
+    
+    def _async_redis(self):
+        # redis.asyncio connections are bound to the event loop that opened
+        # them, so each running loop gets its own client
+        loop = asyncio.get_running_loop()
+        if self._aredis_loop is not loop:
+            import redis.asyncio
+            self._aredis_loop = loop
+            self._aredis = redis.asyncio.Redis.from_url(self.redis_url)
+        return self._aredis
+    
+    async def aget(self, key: str) -> Optional[str]:
+        """
+        Async version of get.
+        """
+        if self._redis is None:
+            # The in-memory cache never blocks
+            return self.get(key)
+        
+        try:
+            value = await self._async_redis().get(key)
+            return value.decode('utf-8') if value is not None else None
+        except Exception as e:
+            logger.warning(f"LLM cache lookup failed: {str(e)}")
+            return None
+    
+    async def aset(self, key: str, value: str) -> None:
+        """
+        Async version of set.
+        """
+        if self._redis is None:
+            self.set(key, value)
+            return
+        
+        try:
+            await self._async_redis().set(key, value.encode('utf-8'), ex=self.ttl_seconds)
+        except Exception as e:
+            logger.warning(f"LLM cache store failed: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,84 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+from config import Config
+
+try:
+    from faster_whisper import WhisperModel, BatchedInferencePipeline
+except ImportError:  # Only needed for TRANSCRIBER_BACKEND=local
+    WhisperModel = BatchedInferencePipeline = None
+
+logger = logging.getLogger(__name__)
+
+class LocalBatchedTranscriber:
+    """
+    Whisper transcription on local hardware with faster-whisper.
+    
+    An alternative to the OpenAI Whisper API for bulk workloads, where paying
+    per audio minute costs more than running a GPU. Each file's speech
+    segments are decoded together by a BatchedInferencePipeline, and the
+    model is loaded with several workers so that multiple files can be
+    transcribed at once from different threads, keeping the GPU busy while
+    other files are being decoded and segmented on the CPU.
+    """
+    
+    def __init__(self, model_name: Optional[str] = None, device: Optional[str] = None,
+                 compute_type: Optional[str] = None, workers: Optional[int] = None):
+        if BatchedInferencePipeline is None:
+            raise RuntimeError("TRANSCRIBER_BACKEND=local requires faster-whisper (pip install faster-whisper)")
+        
+        self.workers = workers or Config.LOCAL_WHISPER_WORKERS
+        model_name = model_name or Config.LOCAL_WHISPER_MODEL
+        logger.info(f"Loading local Whisper model {model_name}")
+        model = WhisperModel(
+            model_name,
+            device=device or Config.LOCAL_WHISPER_DEVICE,
+            compute_type=compute_type or Config.LOCAL_WHISPER_COMPUTE_TYPE,
+            num_workers=self.workers
+        )
+        self._pipe = BatchedInferencePipeline(model=model)
+    
+    def transcribe(self, audio_file_path: str, batch_size: Optional[int] = None) -> Tuple[str, Optional[float]]:
+        """
+        Transcribe one audio file.
+        
+        Returns:
+            Tuple of (transcript text, audio duration in seconds)
+        """
+        segments, info = self._pipe.transcribe(
+            audio_file_path,
+            batch_size=batch_size or Config.LOCAL_WHISPER_BATCH_SIZE
+        )
+        # Segments are generated lazily; inference runs as they are consumed
+        text = ' '.join(segment.text.strip() for segment in segments)
+        return text, info.duration
+    
+    def transcribe_many(self, paths: List[str], batch_size: Optional[int] = None) -> List[str]:
+        """
+        Transcribe several audio files, a few at a time.
+        
+        Returns:
+            Transcript texts in the same order as paths
+        """
+        if not paths:
+            return []
+        
+        with ThreadPoolExecutor(max_workers=min(len(paths), self.workers)) as pool:
+            return [text for text, _ in pool.map(lambda path: self.transcribe(path, batch_size), paths)]
+
+_shared = None
+_shared_lock = threading.Lock()
+
+def shared_transcriber() -> LocalBatchedTranscriber:
+    """
+    The process-wide transcriber, loaded on first use.
+    
+    Loading is deferred so that the model (and CUDA) are only initialized in
+    processes that transcribe, e.g. after gunicorn has forked its workers.
+    """
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = LocalBatchedTranscriber()
+        return _shared
\ No newline at end of file
@@ -0,0 +1,110 @@
+import time
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, List, Optional
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    """
+    Per-minute budget that refills continuously, as in the OpenAI cookbook's
+    parallel request processor.
+    """
+    
+    def __init__(self, per_minute: int):
+        self.capacity = per_minute
+        self.available = float(per_minute)
+        self.updated = time.monotonic()
+    
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.capacity / 60.0)
+        self.updated = now
+    
+    async def acquire(self, amount: int) -> None:
+        """
+        Wait until amount units are available and take them.
+        """
+        amount = min(amount, self.capacity)
+        while True:
+            self._refill()
+            if self.available >= amount:
+                self.available -= amount
+                return
+            await asyncio.sleep((amount - self.available) * 60.0 / self.capacity)
+
+@dataclass
+class Job:
+    request: Callable[[], Awaitable[Any]]
+    estimated_tokens: int
+    future: asyncio.Future
+
+async def worker(queue: asyncio.Queue, rpm_bucket: TokenBucket, tpm_bucket: TokenBucket) -> None:
+    """
+    Run queued requests once both the request and token budgets allow.
+    """
+    while True:
+        job = await queue.get()
+        try:
+            if job.future.done():  # The caller gave up while the job was queued
+                continue
+            await rpm_bucket.acquire(1)
+            await tpm_bucket.acquire(job.estimated_tokens)
+            try:
+                result = await job.request()
+            except Exception as e:
+                if not job.future.done():
+                    job.future.set_exception(e)
+            else:
+                if not job.future.done():
+                    job.future.set_result(result)
+        finally:
+            queue.task_done()
+
+class OpenAIScheduler:
+    """
+    Process-wide scheduler for async OpenAI requests.
+    
+    Requests are queued and started by a pool of worker coroutines only when
+    the requests-per-minute and tokens-per-minute budgets (OPENAI_RPM and
+    OPENAI_TPM) have room, so concurrent callers stay just under the
+    account's rate limits instead of running into 429s. Workers start on
+    first use in the running event loop.
+    """
+    
+    def __init__(self, rpm: Optional[int] = None, tpm: Optional[int] = None,
+                 workers: Optional[int] = None):
+        self.rpm = rpm or Config.OPENAI_RPM
+        self.tpm = tpm or Config.OPENAI_TPM
+        self.worker_count = workers or Config.BATCH_CONCURRENCY
+        self._loop = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+    
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        rpm_bucket = TokenBucket(self.rpm)
+        tpm_bucket = TokenBucket(self.tpm)
+        self._workers = [
+            loop.create_task(worker(self._queue, rpm_bucket, tpm_bucket))
+            for _ in range(self.worker_count)
+        ]
+        logger.info(f"OpenAI scheduler started: {self.worker_count} workers, {self.rpm} RPM, {self.tpm} TPM")
+    
+    async def submit(self, request: Callable[[], Awaitable[Any]], estimated_tokens: int) -> Any:
+        """
+        Run request() once the rate limits allow and return its result.
+        
+        estimated_tokens should cover the prompt and the maximum completion.
+        """
+        self._ensure_started()
+        future = self._loop.create_future()
+        await self._queue.put(Job(request, estimated_tokens, future))
+        return await future
\ No newline at end of file
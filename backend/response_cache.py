@@ -0,0 +1,63 @@
+import os
+import hashlib
+import logging
+from typing import Optional
+from diskcache import Cache
+from config import Config
+from temperature_analyzer import PROMPT_VERSION
+
+logger = logging.getLogger(__name__)
+
+class ResponseCache:
+    """
+    Disk-backed cache of successful analysis responses.
+    
+    Responses are keyed by a hash of the audio bytes together with the models
+    and prompt version used, so identical uploads skip both OpenAI calls.
+    Only analysis results are stored, never the audio itself.
+    """
+    
+    def __init__(self, directory: Optional[str] = None, ttl_seconds: Optional[int] = None):
+        self.directory = directory or os.path.join(Config.UPLOAD_FOLDER, 'cache')
+        self.ttl_seconds = Config.RESPONSE_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self._cache = Cache(self.directory) if self.enabled else None
+    
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+    
+    @staticmethod
+    def make_key(audio_digest: str) -> str:
+        """
+        Build the cache key for an upload from the digest of its audio bytes.
+        """
+        parts = [audio_digest, Config.WHISPER_MODEL, Config.GPT_MODEL, PROMPT_VERSION]
+        return hashlib.sha256('|'.join(parts).encode('utf-8')).hexdigest()
+    
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Look up a cached response.
+        
+        Returns:
+            The cached response data, or None on a miss
+        """
+        if not self.enabled:
+            return None
+        
+        try:
+            return self._cache.get(key)
+        except Exception as e:
+            logger.warning(f"Response cache lookup failed: {str(e)}")
+            return None
+    
+    def set(self, key: str, response_data: dict) -> None:
+        """
+        Store a successful response for ttl_seconds.
+        """
+        if not self.enabled:
+            return
+        
+        try:
+            self._cache.set(key, response_data, expire=self.ttl_seconds)
+        except Exception as e:
+            logger.warning(f"Response cache store failed: {str(e)}")
@@ -0,0 +1,163 @@
+import os
+import re
+import uuid
+import logging
+import threading
+from typing import List, Optional
+import faiss
+import numpy as np
+from diskcache import Cache
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Dated model snapshots share results with their alias (gpt-3.5-turbo-0125 -> gpt-3.5-turbo)
+_MODEL_SNAPSHOT_RE = re.compile(r'-(\d{4}|\d{4}-\d{2}-\d{2})$')
+
+# Store key of a counter bumped on every add, so each process can tell when
+# its in-memory index is missing entries written by another worker
+_GENERATION_KEY = 'generation'
+
+def normalize_model_name(model: str) -> str:
+    return _MODEL_SNAPSHOT_RE.sub('', model)
+
+class SemanticCache:
+    """
+    Cache of GPT analysis results keyed on transcript embeddings.
+    
+    A result is reused when a new transcript's embedding is within the cosine
+    similarity threshold of a previously analyzed one, so near-identical
+    transcripts skip the GPT call. Entries are persisted in diskcache and
+    searched with an in-memory FAISS inner-product index.
+    """
+    
+    def __init__(self, directory: Optional[str] = None, threshold: Optional[float] = None,
+                 ttl_seconds: Optional[int] = None):
+        self.directory = directory or os.path.join(Config.UPLOAD_FOLDER, 'semantic_cache')
+        self.threshold = Config.SEMANTIC_CACHE_THRESHOLD if threshold is None else threshold
+        self.ttl_seconds = Config.RESPONSE_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self._store = None
+        self._store_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._index = None
+        self._keys: List[str] = []
+        self._generation = None
+    
+    @property
+    def enabled(self) -> bool:
+        return Config.SEMANTIC_CACHE_ENABLED and self.ttl_seconds > 0
+    
+    def _open_store(self) -> Cache:
+        # Opened on first use rather than in __init__, so a cache created at
+        # import time doesn't touch UPLOAD_FOLDER before the app has checked it
+        with self._store_lock:
+            if self._store is None:
+                self._store = Cache(self.directory)
+            return self._store
+    
+    @staticmethod
+    def make_namespace(model: str, prompt_version: str) -> str:
+        """
+        Results are only shared between calls using the same model and prompt.
+        """
+        return f"{normalize_model_name(model)}:{prompt_version}"
+    
+    @staticmethod
+    def _normalize(vector: List[float]) -> np.ndarray:
+        array = np.asarray(vector, dtype='float32').reshape(1, -1)
+        faiss.normalize_L2(array)
+        return array
+    
+    def _load_index(self) -> None:
+        """
+        (Re)build the in-memory index from the persisted entries.
+        
+        Called on first use and whenever another worker process has added
+        entries since. Entries that expired in the meantime are dropped.
+        """
+        keys, vectors = [], []
+        for key in self._store.iterkeys():
+            if key == _GENERATION_KEY:
+                continue
+            entry = self._store.get(key)
+            if entry is None:
+                continue
+            keys.append(key)
+            vectors.append(entry['vector'])
+        
+        self._keys = keys
+        self._index = None
+        if vectors:
+            matrix = np.asarray(vectors, dtype='float32')
+            self._index = faiss.IndexFlatIP(matrix.shape[1])
+            self._index.add(matrix)
+    
+    def lookup(self, namespace: str, vector: List[float]) -> Optional[dict]:
+        """
+        Find the cached result of the most similar previous transcript.
+        
+        Returns:
+            The cached analysis result, or None if nothing is similar enough
+        """
+        if not self.enabled:
+            return None
+        
+        try:
+            self._open_store()
+            query = self._normalize(vector)
+            generation = self._store.get(_GENERATION_KEY, 0)
+            with self._lock:
+                if generation != self._generation:
+                    self._load_index()
+                    self._generation = generation
+                if self._index is None or self._index.d != query.shape[1]:
+                    return None
+                
+                scores, positions = self._index.search(query, min(8, len(self._keys)))
+                candidates = [(float(score), self._keys[pos]) for score, pos in zip(scores[0], positions[0]) if pos >= 0]
+            
+            for score, key in candidates:
+                if score < self.threshold:
+                    break
+                entry = self._store.get(key)
+                if entry is not None and entry['namespace'] == namespace:
+                    logger.info(f"Semantic cache hit (similarity {score:.3f})")
+                    return entry['result']
+            
+            return None
+            
+        except Exception as e:
+            logger.warning(f"Semantic cache lookup failed: {str(e)}")
+            return None
+    
+    def add(self, namespace: str, vector: List[float], result: dict) -> None:
+        """
+        Store an analysis result under the embedding of its transcript.
+        """
+        if not self.enabled:
+            return
+        
+        try:
+            self._open_store()
+            query = self._normalize(vector)
+            key = uuid.uuid4().hex
+            self._store.set(key, {
+                'namespace': namespace,
+                'vector': query[0].tolist(),
+                'result': result
+            }, expire=self.ttl_seconds)
+            generation = self._store.incr(_GENERATION_KEY)
+            
+            # Add to the in-memory index directly if it was up to date before
+            # this entry; otherwise the next lookup rebuilds it
+            with self._lock:
+                if self._generation == generation - 1:
+                    if self._index is None:
+                        self._index = faiss.IndexFlatIP(query.shape[1])
+                    if self._index.d == query.shape[1]:
+                        self._index.add(query)
+                        self._keys.append(key)
+                        self._generation = generation
+                    
+        except Exception as e:
+            logger.warning(f"Semantic cache store failed: {str(e)}")
@@ -1,33 +1,290 @@
+import os
+import re
+import atexit
+import asyncio
 import logging
-from typing import Dict, Optional
-from datetime import datetime
+import mimetypes
+from bisect import bisect_right
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor
+from typing import ClassVar, Dict, Iterator, List, Optional, Tuple
+import orjson
+import httpx
 import openai
+from tenacity import (
+    retry, wait_exponential_jitter, stop_after_attempt, retry_if_exception, before_sleep_log
+)
 from config import Config
+from timestamps import now_iso
+from audio_processor import AudioProcessor
+from semantic_cache import SemanticCache
+from llm_cache import LLMCache
+from openai_scheduler import OpenAIScheduler
+import local_transcriber
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever the analysis prompt changes so cached results are invalidated
+PROMPT_VERSION = '1'
+
+# Sampling temperature for the analysis call. Deterministic, so identical
+# requests can be served from the LLM cache.
+ANALYSIS_TEMPERATURE = 0.0
+ANALYSIS_SEED = 42
+ANALYSIS_MAX_TOKENS = 500
+
+# Results are only reused semantically when sampling is near-deterministic
+SEMANTIC_CACHE_MAX_TEMPERATURE = 0.3
+
+# Fallback extraction when GPT doesn't return JSON: explicit scores first,
+# then keyword counts
+_TEMP_PATTERNS = [re.compile(pattern) for pattern in (
+    r'temperature[:\s]*(\d+)',
+    r'score[:\s]*(\d+)',
+    r'rating[:\s]*(\d+)',
+    r'(\d+)[/\s]*100',
+    r'(\d+)\s*out\s*of\s*100'
+)]
+_HOT = frozenset({'angry', 'heated', 'argument', 'fighting', 'shouting', 'politics', 'controversial'})
+_COOL = frozenset({'calm', 'peaceful', 'quiet', 'normal', 'friendly', 'casual'})
+
+# Every score pattern needs a digit, so text with no digit and no keyword is
+# neutral without running the individual searches
+_EXTRACT_PREFILTER = re.compile(r'\d|' + '|'.join(sorted(_HOT | _COOL)))
+
+# Transcripts of up to three filler words, e.g. "um okay", aren't worth analyzing
+_NOISE = frozenset({'um', 'uh', 'hmm', 'ah', 'oh', 'mm', 'mhm', 'yeah', 'yep', 'okay', 'ok'})
+_NOISE_WORD = '(?:' + '|'.join(sorted(_NOISE, key=len, reverse=True)) + ')'
+_NOISE_RE = re.compile(r'\s*' + _NOISE_WORD + r'(?:\s+' + _NOISE_WORD + r'){0,2}\s*', re.IGNORECASE)
+
+# Canned results for transcripts too short to be worth a GPT call, chosen by
+# length: empty, under 10 characters, or under 30 characters of filler words
+_SILENCE_RESULT = MappingProxyType({
+    'temperature': 20,  # Very low for silence
+    'confidence': 0.9,  # High confidence that silence = low temperature
+    'analysis_summary': 'No speech detected - silence or background noise only',
+    'success': True,
+    'emotional_indicators': ('silence',)
+})
+_MINIMAL_SPEECH_RESULT = MappingProxyType({
+    'temperature': 22,  # Slightly higher than silence
+    'confidence': 0.7,
+    'analysis_summary': 'Minimal speech detected: "{transcript}" - likely background sounds',
+    'success': True,
+    'emotional_indicators': ('minimal_speech',)
+})
+_FILLER_RESULT = MappingProxyType({
+    'temperature': 24,
+    'confidence': 0.8,
+    'analysis_summary': 'Only filler words detected: "{transcript}" - no meaningful conversation',
+    'success': True,
+    'emotional_indicators': ('filler_words',)
+})
+_SHORT_THRESHOLDS = (1, 10, 30)
+_SHORT_RESULTS = (_SILENCE_RESULT, _MINIMAL_SPEECH_RESULT, _FILLER_RESULT, None)
+
+# System prompt for the analysis call. Kept byte-identical across requests so
+# the API can reuse its cached prompt prefix.
+_SYSTEM_PROMPT = """You are an expert at analyzing conversation dynamics and emotional temperature.
+
+Your task is to analyze a conversation transcript and rate its "temperature" on a scale of 1-100, where:
+- 1-20: Very calm, peaceful discussion
+- 21-40: Normal conversation, maybe slightly animated
+- 41-60: Moderately heated, some tension or excitement
+- 61-80: Quite heated, heated debate, strong emotions
+- 81-100: Very hot, angry arguments, shouting, highly controversial
+
+Consider these factors:
+1. Emotional intensity (anger, frustration, excitement)
+2. Controversial topics (politics, religion, sensitive subjects)
+3. Language tone (argumentative, confrontational, heated debate)
+4. Interruptions and talking over each other
+5. Use of strong language or inflammatory words
+
+Respond with a JSON object containing:
+- temperature: integer 1-100
+- confidence: float 0.0-1.0 (how confident you are in this score)
+- reasoning: brief explanation of your scoring
+- topics: list of main topics discussed
+- emotional_indicators: list of emotional cues detected
+
+Be objective and consistent in your scoring."""
+
+# Batched analysis: tokens reserved for the system prompt and instructions, and
+# the output budget for each transcript's result
+BATCH_PROMPT_RESERVE_TOKENS = 1000
+BATCH_RESULT_TOKENS = 300
+
+def _estimate_tokens(text: str) -> int:
+    # Roughly four characters per token for English text
+    return len(text) // 4 + 1
+
+def _audio_content_type(audio_file_path: str) -> str:
+    return mimetypes.guess_type(audio_file_path)[0] or 'application/octet-stream'
+
+def _log_connection(response: httpx.Response) -> None:
+    """Log the HTTP version of OpenAI responses."""
+    logger.debug("OpenAI %s: %s", response.request.url.path, response.http_version)
+
+# One long-lived HTTP/2 connection pool and OpenAI client for the process, so
+# Whisper and GPT calls reuse TLS connections across requests instead of
+# handshaking each time
+_HTTP = httpx.Client(
+    http2=True,
+    timeout=httpx.Timeout(60.0, connect=5.0),
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+    event_hooks={'response': [_log_connection]}
+)
+_CLIENT = openai.OpenAI(api_key=Config.OPENAI_API_KEY, http_client=_HTTP)
+# Module-level key for backwards compatibility
+openai.api_key = Config.OPENAI_API_KEY
+atexit.register(_HTTP.close)
+
+# The Whisper and chat endpoints are called with plain httpx requests rather
+# than through the SDK, skipping its per-call model validation and header
+# assembly. Only the messages and token limit vary between chat payloads.
+_API_BASE = str(_CLIENT.base_url).rstrip('/')
+_TRANSCRIPTIONS_URL = f'{_API_BASE}/audio/transcriptions'
+_CHAT_URL = f'{_API_BASE}/chat/completions'
+_AUTH_HEADERS = {'Authorization': f'Bearer {Config.OPENAI_API_KEY}'}
+_HEADERS = {**_AUTH_HEADERS, 'Content-Type': 'application/json'}
+_TRANSCRIPTION_FIELDS = {'model': Config.WHISPER_MODEL, 'response_format': 'json'}
+_BASE_PAYLOAD = {
+    'model': Config.GPT_MODEL,
+    'temperature': ANALYSIS_TEMPERATURE,
+    'max_tokens': ANALYSIS_MAX_TOKENS,
+    'response_format': {'type': 'json_object'},
+    'seed': ANALYSIS_SEED,
+    'messages': [{'role': 'system', 'content': _SYSTEM_PROMPT}, {'role': 'user', 'content': ''}]
+}
+
+def _chat_body(messages: List[Dict], max_tokens: int) -> Dict:
+    body = _BASE_PAYLOAD.copy()
+    body['messages'] = messages
+    body['max_tokens'] = max_tokens
+    return body
+
+def _chat_payload(messages: List[Dict], max_tokens: int) -> bytes:
+    return orjson.dumps(_chat_body(messages, max_tokens))
+
+def _raise_for_status(response: httpx.Response) -> None:
+    """Like response.raise_for_status(), with OpenAI's error message from the body."""
+    if response.is_success:
+        return
+    try:
+        message = orjson.loads(response.content)['error']['message']
+    except (orjson.JSONDecodeError, KeyError, TypeError):
+        message = response.reason_phrase
+    raise httpx.HTTPStatusError(
+        f"OpenAI API error {response.status_code}: {message}",
+        request=response.request,
+        response=response
+    )
+
+def _chat_content(response: httpx.Response) -> str:
+    _raise_for_status(response)
+    return orjson.loads(response.content)['choices'][0]['message'].get('content') or ''
+
+def _transcription_json(response: httpx.Response) -> Dict:
+    _raise_for_status(response)
+    return orjson.loads(response.content)
+
+# Transient OpenAI failures (rate limits, server errors, network problems) are
+# retried with jittered exponential backoff
+def _is_transient(error: BaseException) -> bool:
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code == 429 or error.response.status_code >= 500
+    return isinstance(error, httpx.TransportError)
+
+_openai_retry = retry(
+    wait=wait_exponential_jitter(1, 30),
+    stop=stop_after_attempt(5),
+    retry=retry_if_exception(_is_transient),
+    before_sleep=before_sleep_log(logger, logging.WARNING),
+    reraise=True
+)
+
 class TemperatureAnalyzer:
     """Analyzes conversation transcripts to determine 'temperature' score."""
     
-    def __init__(self):
+    # Process-wide clients and caches, created once at import. Every method
+    # is a class or static method, so callers use the class directly and
+    # nothing is built per request.
+    client: ClassVar[openai.OpenAI] = _CLIENT
+    
+    # Async clients for batch analysis, where many files are in flight at once
+    # on one event loop instead of each blocking a thread. Their connection
+    # pools are bound to the loop that opened them, so they are created per
+    # running loop by _async_clients.
+    _aloop: ClassVar[Optional[asyncio.AbstractEventLoop]] = None
+    _ahttp: ClassVar[Optional[httpx.AsyncClient]] = None
+    _aclient: ClassVar[Optional[openai.AsyncOpenAI]] = None
+    
+    # Async chat requests are paced to the account's rate limits
+    scheduler: ClassVar[OpenAIScheduler] = OpenAIScheduler()
+    
+    semantic_cache: ClassVar[SemanticCache] = SemanticCache()
+    llm_cache: ClassVar[LLMCache] = LLMCache()
+    
+    @classmethod
+    def _async_clients(cls) -> Tuple[httpx.AsyncClient, openai.AsyncOpenAI]:
+        """
+        The async HTTP and OpenAI clients for the running event loop.
+        
+        A new loop (e.g. each asyncio.run) gets new clients, since pooled
+        connections from a closed loop can't be reused.
+        """
+        loop = asyncio.get_running_loop()
+        if cls._aloop is not loop:
+            cls._aloop = loop
+            cls._ahttp = httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+                timeout=60.0
+            )
+            cls._aclient = openai.AsyncOpenAI(api_key=Config.OPENAI_API_KEY, http_client=cls._ahttp)
+        return cls._ahttp, cls._aclient
+    
+    @classmethod
+    def transcribe_audio(cls, audio_file_path: str) -> Dict:
+        """
+        Transcribe audio using OpenAI Whisper, or a local model when
+        TRANSCRIBER_BACKEND is 'local'.
+        
+        Returns:
+            Dictionary with transcription results
+        """
         try:
-            # Set API key for backwards compatibility
-            openai.api_key = Config.OPENAI_API_KEY
+            logger.info(f"Starting transcription for: {audio_file_path}")
             
-            # Initialize OpenAI client with explicit API key
-            self.client = openai.OpenAI(
-                api_key=Config.OPENAI_API_KEY
-            )
+            # Check the duration from the header before paying for an upload
+            duration = cls._probe_duration(audio_file_path)
+            if duration == 0:
+                return cls._transcription_error('Audio file is empty')
             
-            logger.info("OpenAI client initialized successfully")
+            if Config.TRANSCRIBER_BACKEND == 'local':
+                return cls._local_transcription(audio_file_path)
+            
+            if duration is not None and duration > Config.WHISPER_CHUNK_SECONDS:
+                segment_paths = AudioProcessor.split_audio(audio_file_path, Config.WHISPER_CHUNK_SECONDS)
+                try:
+                    with ThreadPoolExecutor(max_workers=min(len(segment_paths), Config.BATCH_CONCURRENCY)) as pool:
+                        transcripts = list(pool.map(cls._whisper_call, segment_paths))
+                finally:
+                    for segment_path in segment_paths:
+                        AudioProcessor.cleanup_file(segment_path)
+                return cls._transcription_result(cls._join_transcripts(transcripts), duration)
+            
+            transcript = cls._whisper_call(audio_file_path)
+            return cls._transcription_result(transcript.get('text'), transcript.get('duration'))
             
         except Exception as e:
-            logger.error(f"Failed to initialize OpenAI client: {str(e)}")
-            raise Exception(f"OpenAI initialization failed: {str(e)}. Please check your API key and internet connection.")
+            return cls._transcription_error(str(e))
     
-    def transcribe_audio(self, audio_file_path: str) -> Dict:
+    @classmethod
+    async def atranscribe_audio(cls, audio_file_path: str) -> Dict:
         """
-        Transcribe audio using OpenAI Whisper.
+        Async version of transcribe_audio.
         
         Returns:
             Dictionary with transcription results
@@ -35,40 +292,223 @@ class TemperatureAnalyzer:
         try:
             logger.info(f"Starting transcription for: {audio_file_path}")
             
-            with open(audio_file_path, 'rb') as audio_file:
-                transcript = self.client.audio.transcriptions.create(
-                    model=Config.WHISPER_MODEL,
-                    file=audio_file,
-                    response_format="json"
-                )
+            # Check the duration from the header before paying for an upload
+            duration = await asyncio.to_thread(cls._probe_duration, audio_file_path)
+            if duration == 0:
+                return cls._transcription_error('Audio file is empty')
             
-            # Clean and validate transcript text
-            transcript_text = transcript.text.strip() if transcript.text else ""
+            if Config.TRANSCRIBER_BACKEND == 'local':
+                return await asyncio.to_thread(cls._local_transcription, audio_file_path)
             
-            result = {
-                'text': transcript_text,
-                'success': True,
-                'duration': getattr(transcript, 'duration', None)
-            }
+            if duration is not None and duration > Config.WHISPER_CHUNK_SECONDS:
+                segment_paths = await asyncio.to_thread(AudioProcessor.split_audio, audio_file_path, Config.WHISPER_CHUNK_SECONDS)
+                try:
+                    transcripts = await asyncio.gather(*(cls._awhisper_call(path) for path in segment_paths))
+                finally:
+                    for segment_path in segment_paths:
+                        AudioProcessor.cleanup_file(segment_path)
+                return cls._transcription_result(cls._join_transcripts(transcripts), duration)
             
-            logger.info(f"Transcription completed. Length: {len(transcript_text)} characters")
+            transcript = await cls._awhisper_call(audio_file_path)
+            return cls._transcription_result(transcript.get('text'), transcript.get('duration'))
             
-            # Check if transcript is meaningful
-            if len(transcript_text) < 3:
-                logger.warning("Transcription resulted in very short or empty text")
-                result['warning'] = 'Very short or empty transcription'
+        except Exception as e:
+            return cls._transcription_error(str(e))
+    
+    @staticmethod
+    @_openai_retry
+    def _whisper_call(audio_file_path: str) -> Dict:
+        # Pass an open file object (never a path or bytes) so httpx streams it
+        # from disk in chunks instead of reading it all. The file is reopened
+        # on each attempt.
+        with open(audio_file_path, 'rb') as audio_file:
+            return _transcription_json(_HTTP.post(
+                _TRANSCRIPTIONS_URL,
+                headers=_AUTH_HEADERS,
+                data=_TRANSCRIPTION_FIELDS,
+                files={'file': (os.path.basename(audio_file_path), audio_file, _audio_content_type(audio_file_path))}
+            ))
+    
+    @classmethod
+    def _local_transcription(cls, audio_file_path: str) -> Dict:
+        # Runs on a worker thread for async callers; the model is loaded with
+        # several workers, so concurrent files are transcribed in parallel
+        text, duration = local_transcriber.shared_transcriber().transcribe(audio_file_path)
+        return cls._transcription_result(text, duration)
+    
+    @classmethod
+    @_openai_retry
+    async def _awhisper_call(cls, audio_file_path: str) -> Dict:
+        # As in _whisper_call, httpx streams the open file in 64KiB reads, so
+        # only one chunk of each in-flight upload is held in memory
+        with open(audio_file_path, 'rb') as audio_file:
+            ahttp, _ = cls._async_clients()
+            return _transcription_json(await ahttp.post(
+                _TRANSCRIPTIONS_URL,
+                headers=_AUTH_HEADERS,
+                data=_TRANSCRIPTION_FIELDS,
+                files={'file': (os.path.basename(audio_file_path), audio_file, _audio_content_type(audio_file_path))}
+            ))
+    
+    @staticmethod
+    @_openai_retry
+    def _chat_call(messages: List[Dict], max_tokens: int = ANALYSIS_MAX_TOKENS) -> str:
+        """
+        Run a chat completion and return the message content.
+        """
+        return _chat_content(_HTTP.post(_CHAT_URL, headers=_HEADERS, content=_chat_payload(messages, max_tokens)))
+    
+    @classmethod
+    @_openai_retry
+    async def _achat_call(cls, messages: List[Dict], max_tokens: int = ANALYSIS_MAX_TOKENS) -> str:
+        ahttp, _ = cls._async_clients()
+        estimated_tokens = sum(_estimate_tokens(message['content']) for message in messages) + max_tokens
+        response = await cls.scheduler.submit(
+            lambda: ahttp.post(_CHAT_URL, headers=_HEADERS, content=_chat_payload(messages, max_tokens)),
+            estimated_tokens
+        )
+        return _chat_content(response)
+    
+    @staticmethod
+    def _probe_duration(audio_file_path: str) -> Optional[float]:
+        try:
+            return AudioProcessor.probe_duration(audio_file_path)
+        except Exception as e:
+            logger.warning(f"Could not read audio duration before transcription: {str(e)}")
+            return None
+    
+    @staticmethod
+    def _join_transcripts(transcripts) -> str:
+        return ' '.join(transcript['text'].strip() for transcript in transcripts if transcript.get('text'))
+    
+    @staticmethod
+    def _transcription_result(text: Optional[str], duration: Optional[float]) -> Dict:
+        """
+        Build the transcription result from Whisper's text.
+        """
+        # Clean and validate transcript text
+        transcript_text = text.strip() if text else ""
+        
+        result = {
+            'text': transcript_text,
+            'success': True,
+            'duration': duration
+        }
+        
+        logger.info(f"Transcription completed. Length: {len(transcript_text)} characters")
+        
+        # Check if transcript is meaningful
+        if len(transcript_text) < 3:
+            logger.warning("Transcription resulted in very short or empty text")
+            result['warning'] = 'Very short or empty transcription'
+        
+        return result
+    
+    @staticmethod
+    def _transcription_error(error: str) -> Dict:
+        logger.error(f"Transcription error: {error}")
+        return {
+            'text': '',
+            'success': False,
+            'error': error
+        }
+    
+    @classmethod
+    def _uses_semantic_cache(cls) -> bool:
+        return cls.semantic_cache.enabled and ANALYSIS_TEMPERATURE <= SEMANTIC_CACHE_MAX_TEMPERATURE
+    
+    @classmethod
+    def _embed_transcript(cls, transcript: str) -> Optional[List[float]]:
+        """
+        Embed a transcript for the semantic cache.
+        
+        Returns:
+            Embedding vector, or None if the semantic cache is not used
+        """
+        if not cls._uses_semantic_cache():
+            return None
+        
+        try:
+            response = cls.client.embeddings.create(
+                model=Config.EMBEDDING_MODEL,
+                input=transcript
+            )
+            return response.data[0].embedding
             
-            return result
+        except Exception as e:
+            logger.warning(f"Transcript embedding failed, skipping semantic cache: {str(e)}")
+            return None
+    
+    @classmethod
+    async def _aembed_transcript(cls, transcript: str) -> Optional[List[float]]:
+        """
+        Async version of _embed_transcript.
+        """
+        if not cls._uses_semantic_cache():
+            return None
+        
+        try:
+            _, aclient = cls._async_clients()
+            response = await aclient.embeddings.create(
+                model=Config.EMBEDDING_MODEL,
+                input=transcript
+            )
+            return response.data[0].embedding
             
         except Exception as e:
-            logger.error(f"Transcription error: {str(e)}")
-            return {
-                'text': '',
-                'success': False,
-                'error': str(e)
-            }
+            logger.warning(f"Transcript embedding failed, skipping semantic cache: {str(e)}")
+            return None
     
-    def analyze_conversation_temperature(self, transcript: str) -> Dict:
+    @classmethod
+    def _semantic_cache_lookup(cls, cache_namespace: str, embedding: Optional[List[float]], transcript: str) -> Optional[Dict]:
+        """
+        Reuse the analysis of a near-identical earlier transcript, if any.
+        """
+        if embedding is None:
+            return None
+        
+        cached_result = cls.semantic_cache.lookup(cache_namespace, embedding)
+        if cached_result is not None:
+            cached_result.update({
+                'transcript_length': len(transcript),
+                'timestamp': now_iso(),
+                'cached': 'semantic'
+            })
+        return cached_result
+    
+    @classmethod
+    def _llm_cache_result(cls, cached_text: Optional[str], transcript: str) -> Optional[Dict]:
+        """
+        Reuse the response to an identical earlier request, if any.
+        """
+        if cached_text is None:
+            return None
+        
+        logger.info("LLM cache hit")
+        result = cls._parse_analysis_text(cached_text, transcript)
+        result['cached'] = 'llm'
+        return result
+    
+    @classmethod
+    def _store_analysis(cls, analysis_text: str, transcript: str, cache_namespace: str,
+                        embedding: Optional[List[float]]) -> Dict:
+        """
+        Parse a fresh GPT response and remember it in the semantic cache.
+        
+        The caller stores non-empty responses in the LLM cache, which has a
+        sync and an async interface.
+        """
+        logger.info(f"Raw analysis response: {analysis_text}")
+        result = cls.parse_analysis_response(analysis_text, transcript)
+        
+        if analysis_text and embedding is not None:
+            cls.semantic_cache.add(cache_namespace, embedding, result)
+        
+        logger.info(f"Temperature analysis completed: {result['temperature']}")
+        return result
+    
+    @classmethod
+    def analyze_conversation_temperature(cls, transcript: str) -> Dict:
         """
         Analyze transcript to determine conversation 'temperature'.
         
@@ -77,172 +517,326 @@ class TemperatureAnalyzer:
         """
         transcript = transcript.strip() if transcript else ""
         
-        # Handle completely empty transcripts
-        if not transcript:
-            return {
-                'temperature': 20,  # Very low for silence
-                'confidence': 0.9,  # High confidence that silence = low temperature
-                'analysis_summary': 'No speech detected - silence or background noise only',
-                'success': True,
-                'topics': [],
-                'emotional_indicators': ['silence']
-            }
-        
-        # Handle very short transcripts (likely just noise, coughs, etc.)
-        if len(transcript) < 10:
-            return {
-                'temperature': 22,  # Slightly higher than silence
-                'confidence': 0.7,
-                'analysis_summary': f'Minimal speech detected: "{transcript[:50]}" - likely background sounds',
-                'success': True,
-                'topics': [],
-                'emotional_indicators': ['minimal_speech']
-            }
+        short_result = cls.short_transcript_result(transcript)
+        if short_result is not None:
+            return short_result
         
-        # Handle short but potentially meaningful transcripts
-        if len(transcript) < 30:
-            # Check for common non-conversational sounds
-            noise_words = ['um', 'uh', 'hmm', 'ah', 'oh', 'mm', 'mhm', 'yeah', 'yep', 'okay', 'ok']
-            words = transcript.lower().split()
+        try:
+            # Identical requests skip the API entirely
+            messages = cls._analysis_messages(transcript)
+            llm_cache_key = cls._llm_cache_key(messages)
+            cached_result = cls._llm_cache_result(cls.llm_cache.get(llm_cache_key), transcript)
+            if cached_result is not None:
+                return cached_result
             
-            if len(words) <= 3 and all(word in noise_words for word in words):
-                return {
-                    'temperature': 24,
-                    'confidence': 0.8,
-                    'analysis_summary': f'Only filler words detected: "{transcript}" - no meaningful conversation',
-                    'success': True,
-                    'topics': [],
-                    'emotional_indicators': ['filler_words']
-                }
+            cache_namespace = SemanticCache.make_namespace(Config.GPT_MODEL, PROMPT_VERSION)
+            embedding = cls._embed_transcript(transcript)
+            cached_result = cls._semantic_cache_lookup(cache_namespace, embedding, transcript)
+            if cached_result is not None:
+                return cached_result
             
-            # Short but potentially meaningful - analyze with caution
-            logger.info(f"Analyzing short transcript: '{transcript}'")
+            logger.info("Starting temperature analysis")
+            analysis_text = cls._chat_call(messages).strip()
+            result = cls._store_analysis(analysis_text, transcript, cache_namespace, embedding)
+            if analysis_text:
+                cls.llm_cache.set(llm_cache_key, analysis_text)
+            return result
+            
+        except Exception as e:
+            return cls.analysis_error_result(e)
+    
+    @classmethod
+    async def aanalyze_conversation_temperature(cls, transcript: str) -> Dict:
+        """
+        Async version of analyze_conversation_temperature.
         
-        # Proceed with normal analysis for longer transcripts
+        Returns:
+            Dictionary with temperature analysis results
+        """
+        transcript = transcript.strip() if transcript else ""
+        
+        short_result = cls.short_transcript_result(transcript)
+        if short_result is not None:
+            return short_result
         
         try:
+            # Identical requests skip the API entirely
+            messages = cls._analysis_messages(transcript)
+            llm_cache_key = cls._llm_cache_key(messages)
+            cached_result = cls._llm_cache_result(await cls.llm_cache.aget(llm_cache_key), transcript)
+            if cached_result is not None:
+                return cached_result
+            
+            cache_namespace = SemanticCache.make_namespace(Config.GPT_MODEL, PROMPT_VERSION)
+            embedding = await cls._aembed_transcript(transcript)
+            cached_result = cls._semantic_cache_lookup(cache_namespace, embedding, transcript)
+            if cached_result is not None:
+                return cached_result
+            
             logger.info("Starting temperature analysis")
+            analysis_text = (await cls._achat_call(messages)).strip()
+            result = cls._store_analysis(analysis_text, transcript, cache_namespace, embedding)
+            if analysis_text:
+                await cls.llm_cache.aset(llm_cache_key, analysis_text)
+            return result
             
-            # Construct the analysis prompt
-            system_prompt = """You are an expert at analyzing conversation dynamics and emotional temperature.
-
-Your task is to analyze a conversation transcript and rate its "temperature" on a scale of 1-100, where:
-- 1-20: Very calm, peaceful discussion
-- 21-40: Normal conversation, maybe slightly animated
-- 41-60: Moderately heated, some tension or excitement
-- 61-80: Quite heated, heated debate, strong emotions
-- 81-100: Very hot, angry arguments, shouting, highly controversial
-
-Consider these factors:
-1. Emotional intensity (anger, frustration, excitement)
-2. Controversial topics (politics, religion, sensitive subjects)
-3. Language tone (argumentative, confrontational, heated debate)
-4. Interruptions and talking over each other
-5. Use of strong language or inflammatory words
-
-Respond with a JSON object containing:
-- temperature: integer 1-100
-- confidence: float 0.0-1.0 (how confident you are in this score)
-- reasoning: brief explanation of your scoring
-- topics: list of main topics discussed
-- emotional_indicators: list of emotional cues detected
-
-Be objective and consistent in your scoring."""
-
-            user_prompt = f"""Analyze this conversation transcript and rate its temperature:
+        except Exception as e:
+            return cls.analysis_error_result(e)
+    
+    @classmethod
+    def analyze_conversation_temperatures(cls, transcripts: List[str]) -> List[Dict]:
+        """
+        Analyze many transcripts with as few GPT calls as possible.
+        
+        Transcripts are sent as a numbered list in one request, split so each
+        request fits in the model's context window. Transcripts too short to
+        analyze get their canned result, and a batch whose response doesn't
+        match up is retried one transcript at a time.
+        
+        Returns:
+            Analysis results in the same order as transcripts
+        """
+        results: List[Optional[Dict]] = [None] * len(transcripts)
+        pending = []
+        
+        for index, transcript in enumerate(transcripts):
+            transcript = transcript.strip() if transcript else ""
+            short_result = cls.short_transcript_result(transcript)
+            if short_result is not None:
+                results[index] = short_result
+            else:
+                pending.append((index, transcript))
+        
+        for batch in cls._split_batches(pending):
+            batch_results = cls._analyze_batch([transcript for _, transcript in batch])
+            for (index, _), result in zip(batch, batch_results):
+                results[index] = result
+        
+        return results
+    
+    @staticmethod
+    def _split_batches(items: List[Tuple[int, str]]) -> Iterator[List[Tuple[int, str]]]:
+        """
+        Group (index, transcript) pairs into batches that fit one request.
+        
+        Each transcript is budgeted at its estimated prompt tokens plus the
+        tokens of its result, within both the context and output limits.
+        """
+        context_budget = Config.GPT_CONTEXT_LIMIT - BATCH_PROMPT_RESERVE_TOKENS
+        max_batch_size = max(1, Config.GPT_MAX_OUTPUT_TOKENS // BATCH_RESULT_TOKENS)
+        batch, batch_tokens = [], 0
+        
+        for item in items:
+            tokens = _estimate_tokens(item[1]) + BATCH_RESULT_TOKENS
+            if batch and (batch_tokens + tokens > context_budget or len(batch) >= max_batch_size):
+                yield batch
+                batch, batch_tokens = [], 0
+            batch.append(item)
+            batch_tokens += tokens
+        
+        if batch:
+            yield batch
+    
+    @classmethod
+    def _analyze_batch(cls, transcripts: List[str]) -> List[Dict]:
+        """
+        Analyze a batch of transcripts in a single GPT call.
+        """
+        if len(transcripts) == 1:
+            return [cls.analyze_conversation_temperature(transcripts[0])]
+        
+        try:
+            logger.info(f"Starting batch temperature analysis of {len(transcripts)} transcripts")
+            
+            analysis_text = cls._chat_call(
+                cls._batch_analysis_messages(transcripts),
+                max_tokens=BATCH_RESULT_TOKENS * len(transcripts)
+            )
+            
+            analysis_items = orjson.loads(analysis_text).get('results')
+            if not isinstance(analysis_items, list) or len(analysis_items) != len(transcripts):
+                raise ValueError(f"Expected {len(transcripts)} results in batch response")
+            
+            # A malformed item fails the batch like a malformed response does
+            results = []
+            for analysis_data, transcript in zip(analysis_items, transcripts):
+                result = cls._validate_analysis_result(analysis_data if isinstance(analysis_data, dict) else {}, transcript)
+                result['success'] = True
+                results.append(result)
+                
+        except Exception as e:
+            logger.warning(f"Batch analysis failed, analyzing transcripts individually: {str(e)}")
+            return [cls.analyze_conversation_temperature(transcript) for transcript in transcripts]
+        
+        logger.info(f"Batch temperature analysis completed for {len(results)} transcripts")
+        return results
+    
+    @staticmethod
+    def short_transcript_result(transcript: str) -> Optional[Dict]:
+        """
+        Canned results for transcripts too short to be worth a GPT call.
+        
+        Returns:
+            The analysis result, or None if the transcript needs full analysis
+        """
+        template = _SHORT_RESULTS[bisect_right(_SHORT_THRESHOLDS, len(transcript))]
+        if template is None:
+            return None
+        
+        # Short but potentially meaningful transcripts are analyzed with caution
+        if template is _FILLER_RESULT and not _NOISE_RE.fullmatch(transcript):
+            logger.info(f"Analyzing short transcript: '{transcript}'")
+            return None
+        
+        return {
+            **template,
+            'analysis_summary': template['analysis_summary'].format(transcript=transcript[:50]),
+            'topics': [],
+            'emotional_indicators': list(template['emotional_indicators'])
+        }
+    
+    @staticmethod
+    def _analysis_messages(transcript: str) -> List[Dict]:
+        """
+        Build the chat messages asking GPT to rate a transcript.
+        """
+        user_prompt = f"""Analyze this conversation transcript and rate its temperature:
 
 TRANSCRIPT:
 {transcript}
 
 Remember to respond with valid JSON only."""
+        
+        return [
+            {"role": "system", "content": _SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt}
+        ]
+    
+    @staticmethod
+    def _batch_analysis_messages(transcripts: List[str]) -> List[Dict]:
+        """
+        Build the chat messages asking GPT to rate several transcripts at once.
+        """
+        count = len(transcripts)
+        numbered = '\n\n'.join(f"[{number}]\n{transcript}" for number, transcript in enumerate(transcripts, 1))
+        user_prompt = f"""Analyze each of the following {count} conversation transcripts and rate its temperature.
 
-            response = self.client.chat.completions.create(
-                model=Config.GPT_MODEL,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.3,  # Lower temperature for more consistent analysis
-                max_tokens=500
-            )
-            
-            # Parse the response
-            analysis_text = response.choices[0].message.content.strip() if response.choices[0].message.content else ""
-            logger.info(f"Raw analysis response: {analysis_text}")
-            
-            # Handle empty response from GPT
-            if not analysis_text:
-                logger.warning("GPT returned empty response")
-                return {
-                    'temperature': 25,
-                    'confidence': 0.3,
-                    'analysis_summary': 'AI analysis returned empty response - defaulting to neutral temperature',
-                    'success': True,
-                    'topics': [],
-                    'emotional_indicators': ['empty_ai_response']
-                }
-            
-            # Try to parse as JSON
-            import json
-            try:
-                analysis_data = json.loads(analysis_text)
-            except json.JSONDecodeError:
-                # Fallback: extract temperature from text if JSON parsing fails
-                logger.warning("Failed to parse JSON response, attempting text extraction")
-                temperature = self._extract_temperature_from_text(analysis_text)
-                analysis_data = {
-                    'temperature': temperature,
-                    'confidence': 0.5,
-                    'reasoning': 'Fallback analysis due to JSON parsing error',
-                    'topics': [],
-                    'emotional_indicators': []
-                }
-            
-            # Validate and clean the data
-            result = self._validate_analysis_result(analysis_data, transcript)
-            result['success'] = True
-            
-            logger.info(f"Temperature analysis completed: {result['temperature']}")
-            return result
-            
-        except Exception as e:
-            logger.error(f"Analysis error: {str(e)}")
-            # Return a safe fallback
-            return {
-                'temperature': 30,  # Neutral default
-                'confidence': 0.2,
-                'analysis_summary': f'Analysis failed: {str(e)}',
-                'success': False,
-                'error': str(e)
+Respond with a JSON object {{"results": [...]}} where results is an array of exactly {count} objects, in the same order as the transcripts, each with the fields temperature, confidence, reasoning, topics and emotional_indicators.
+
+{numbered}"""
+        
+        return [
+            {"role": "system", "content": _SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt}
+        ]
+    
+    @staticmethod
+    def _llm_cache_key(messages: List[Dict]) -> str:
+        return LLMCache.make_key(
+            Config.GPT_MODEL,
+            messages[0]['content'],
+            messages[1]['content'],
+            ANALYSIS_TEMPERATURE
+        )
+    
+    @classmethod
+    def analysis_request_body(cls, transcript: str) -> Dict:
+        """
+        The chat completion request body that analyzes one transcript.
+        
+        The same request analyze_conversation_temperature sends, for callers
+        that submit it another way, such as the Batch API.
+        """
+        return _chat_body(cls._analysis_messages(transcript), ANALYSIS_MAX_TOKENS)
+    
+    @classmethod
+    def parse_analysis_response(cls, analysis_text: str, transcript: str) -> Dict:
+        """
+        Turn the message content of an analysis response into its result.
+        
+        Returns:
+            Dictionary with temperature analysis results
+        """
+        analysis_text = analysis_text.strip()
+        
+        # Handle empty response from GPT
+        if not analysis_text:
+            logger.warning("GPT returned empty response")
+            return cls._empty_response_result()
+        
+        return cls._parse_analysis_text(analysis_text, transcript)
+    
+    @classmethod
+    def _parse_analysis_text(cls, analysis_text: str, transcript: str) -> Dict:
+        """
+        Turn GPT's analysis text into a validated analysis result.
+        """
+        # JSON mode guarantees valid JSON, so text extraction is a last resort
+        try:
+            analysis_data = orjson.loads(analysis_text)
+        except orjson.JSONDecodeError:
+            # Fallback: extract temperature from text if JSON parsing fails
+            logger.warning("Failed to parse JSON response, attempting text extraction")
+            temperature = cls._extract_temperature_from_text(analysis_text)
+            analysis_data = {
+                'temperature': temperature,
+                'confidence': 0.5,
+                'reasoning': 'Fallback analysis due to JSON parsing error',
+                'topics': [],
+                'emotional_indicators': []
             }
+        
+        # Validate and clean the data
+        result = cls._validate_analysis_result(analysis_data, transcript)
+        result['success'] = True
+        return result
+    
+    @staticmethod
+    def _empty_response_result() -> Dict:
+        return {
+            'temperature': 25,
+            'confidence': 0.3,
+            'analysis_summary': 'AI analysis returned empty response - defaulting to neutral temperature',
+            'success': True,
+            'topics': [],
+            'emotional_indicators': ['empty_ai_response']
+        }
+    
+    @staticmethod
+    def analysis_error_result(e: Exception) -> Dict:
+        """
+        The result reported when analysis fails with error e.
+        """
+        logger.error(f"Analysis error: {str(e)}")
+        # Return a safe fallback
+        return {
+            'temperature': 30,  # Neutral default
+            'confidence': 0.2,
+            'analysis_summary': f'Analysis failed: {str(e)}',
+            'success': False,
+            'error': str(e)
+        }
     
-    def _extract_temperature_from_text(self, text: str) -> int:
+    @staticmethod
+    def _extract_temperature_from_text(text: str) -> int:
         """
         Fallback method to extract temperature from text response.
         """
-        import re
+        low = text.lower()
         
-        # Look for temperature mentions in the text
-        temp_patterns = [
-            r'temperature[:\s]*(\d+)',
-            r'score[:\s]*(\d+)',
-            r'rating[:\s]*(\d+)',
-            r'(\d+)[/\s]*100',
-            r'(\d+)\s*out\s*of\s*100'
-        ]
+        if not _EXTRACT_PREFILTER.search(low):
+            return 40  # Neutral
         
-        for pattern in temp_patterns:
-            match = re.search(pattern, text.lower())
+        # Look for temperature mentions in the text
+        for pattern in _TEMP_PATTERNS:
+            match = pattern.search(low)
             if match:
                 temp = int(match.group(1))
                 return max(1, min(100, temp))  # Clamp to valid range
         
         # If no temperature found, estimate based on keywords
-        hot_keywords = ['angry', 'heated', 'argument', 'fighting', 'shouting', 'politics', 'controversial']
-        cool_keywords = ['calm', 'peaceful', 'quiet', 'normal', 'friendly', 'casual']
-        
-        hot_count = sum(1 for keyword in hot_keywords if keyword in text.lower())
-        cool_count = sum(1 for keyword in cool_keywords if keyword in text.lower())
+        hot_count = sum(1 for keyword in _HOT if keyword in low)
+        cool_count = sum(1 for keyword in _COOL if keyword in low)
         
         if hot_count > cool_count:
             return 65
@@ -251,7 +845,8 @@ Remember to respond with valid JSON only."""
         else:
             return 40  # Neutral
     
-    def _validate_analysis_result(self, analysis_data: Dict, transcript: str) -> Dict:
+    @staticmethod
+    def _validate_analysis_result(analysis_data: Dict, transcript: str) -> Dict:
         """
         Validate and clean analysis results.
         """
@@ -292,10 +887,11 @@ Remember to respond with valid JSON only."""
             'topics': topics,
             'emotional_indicators': emotional_indicators,
             'transcript_length': len(transcript),
-            'timestamp': datetime.utcnow().isoformat() + 'Z'
+            'timestamp': now_iso()
         }
     
-    def analyze_audio_file(self, audio_file_path: str) -> Dict:
+    @classmethod
+    def analyze_audio_file(cls, audio_file_path: str) -> Dict:
         """
         Complete pipeline: transcribe audio and analyze temperature.
         
@@ -304,18 +900,90 @@ Remember to respond with valid JSON only."""
         """
         logger.info(f"Starting complete audio analysis for: {audio_file_path}")
         
+        # Skip Whisper entirely for audio without speech
+        if Config.VAD_MIN_SPEECH_RATIO > 0 and cls._is_silent(AudioProcessor.speech_ratio(audio_file_path)):
+            return cls._combine_results('', cls.short_transcript_result(''))
+        
         # Step 1: Transcribe audio
-        transcription_result = self.transcribe_audio(audio_file_path)
+        transcription_result = cls.transcribe_audio(audio_file_path)
         
         if not transcription_result['success']:
-            return {
-                'success': False,
-                'error': f"Transcription failed: {transcription_result.get('error', 'Unknown error')}",
-                'temperature': 30,  # Safe default
-                'confidence': 0.1,
-                'analysis_summary': 'Analysis failed due to transcription error'
-            }
+            return cls._transcription_failure(transcription_result)
         
+        transcript = cls._checked_transcript(transcription_result)
+        
+        # Step 2: Analyze temperature
+        temperature_result = cls.analyze_conversation_temperature(transcript)
+        
+        return cls._combine_results(transcript, temperature_result)
+    
+    @classmethod
+    async def aanalyze_audio_file(cls, audio_file_path: str) -> Dict:
+        """
+        Async version of analyze_audio_file.
+        
+        Returns:
+            Dictionary with complete analysis results
+        """
+        logger.info(f"Starting complete audio analysis for: {audio_file_path}")
+        
+        # Skip Whisper entirely for audio without speech
+        if Config.VAD_MIN_SPEECH_RATIO > 0:
+            speech_ratio = await asyncio.to_thread(AudioProcessor.speech_ratio, audio_file_path)
+            if cls._is_silent(speech_ratio):
+                return cls._combine_results('', cls.short_transcript_result(''))
+        
+        # Step 1: Transcribe audio
+        transcription_result = await cls.atranscribe_audio(audio_file_path)
+        
+        if not transcription_result['success']:
+            return cls._transcription_failure(transcription_result)
+        
+        transcript = cls._checked_transcript(transcription_result)
+        
+        # Step 2: Analyze temperature
+        temperature_result = await cls.aanalyze_conversation_temperature(transcript)
+        
+        return cls._combine_results(transcript, temperature_result)
+    
+    @classmethod
+    async def analyze_audio_files_batch(cls, paths: List[str], concurrency: Optional[int] = None) -> List[Dict]:
+        """
+        Analyze many audio files concurrently.
+        
+        At most `concurrency` files (default Config.BATCH_CONCURRENCY) are in
+        flight at once.
+        
+        Returns:
+            Analysis results in the same order as paths
+        """
+        semaphore = asyncio.Semaphore(concurrency or Config.BATCH_CONCURRENCY)
+        
+        async def analyze(path: str) -> Dict:
+            async with semaphore:
+                return await cls.aanalyze_audio_file(path)
+        
+        return await asyncio.gather(*(analyze(path) for path in paths))
+    
+    @staticmethod
+    def _is_silent(speech_ratio: Optional[float]) -> bool:
+        if speech_ratio is None or speech_ratio >= Config.VAD_MIN_SPEECH_RATIO:
+            return False
+        logger.info(f"No speech detected (speech ratio {speech_ratio:.3f}), skipping transcription")
+        return True
+    
+    @staticmethod
+    def _transcription_failure(transcription_result: Dict) -> Dict:
+        return {
+            'success': False,
+            'error': f"Transcription failed: {transcription_result.get('error', 'Unknown error')}",
+            'temperature': 30,  # Safe default
+            'confidence': 0.1,
+            'analysis_summary': 'Analysis failed due to transcription error'
+        }
+    
+    @staticmethod
+    def _checked_transcript(transcription_result: Dict) -> str:
         transcript = transcription_result['text']
         logger.info(f"Transcription successful, analyzing temperature for {len(transcript)} characters")
         
@@ -323,10 +991,13 @@ Remember to respond with valid JSON only."""
         if 'warning' in transcription_result:
             logger.info(f"Transcription warning: {transcription_result['warning']}")
         
-        # Step 2: Analyze temperature
-        temperature_result = self.analyze_conversation_temperature(transcript)
-        
-        # Combine results
+        return transcript
+    
+    @staticmethod
+    def _combine_results(transcript: str, temperature_result: Dict) -> Dict:
+        """
+        Combine the transcript and its temperature analysis into the final result.
+        """
         final_result = {
             'success': temperature_result['success'],
             'temperature': temperature_result['temperature'],
@@ -336,9 +1007,12 @@ Remember to respond with valid JSON only."""
             'transcript_length': len(transcript),
             'topics': temperature_result.get('topics', []),
             'emotional_indicators': temperature_result.get('emotional_indicators', []),
-            'timestamp': datetime.utcnow().isoformat() + 'Z'
+            'timestamp': now_iso()
         }
         
+        if 'cached' in temperature_result:
+            final_result['cached'] = temperature_result['cached']
+        
         if not temperature_result['success']:
             final_result['error'] = temperature_result.get('error', 'Analysis failed')
         
@@ -0,0 +1,16 @@
+import os
+import sys
+import shutil
+import tempfile
+
+# Set before any backend module loads Config: a placeholder API key (never a
+# real one), and a private upload folder so caches and uploads don't touch
+# the default /var/lib/audio_uploads or persist between runs
+os.environ['OPENAI_API_KEY'] = 'test_key'
+os.environ['UPLOAD_FOLDER'] = tempfile.mkdtemp(prefix='room_temp_tests_')
+
+# Make the backend modules importable from the tests
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(os.environ['UPLOAD_FOLDER'], ignore_errors=True)
\ No newline at end of file
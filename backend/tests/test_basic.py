@@ -0,0 +1,528 @@
+"""
+Basic tests for the AI Room Temperature backend
+
+Run from the backend directory with: pytest -n auto tests/
+"""
+
+import io
+import os
+import wave
+import asyncio
+from dataclasses import FrozenInstanceError, replace
+from unittest.mock import Mock, patch
+import orjson
+import pytest
+from werkzeug.datastructures import FileStorage
+from werkzeug.test import encode_multipart
+
+from config import Config
+from audio_processor import AudioProcessor
+from temperature_analyzer import TemperatureAnalyzer
+
+def test_config():
+    """Test configuration loading"""
+    # conftest.py sets the environment before Config is loaded
+    assert Config.OPENAI_API_KEY == 'test_key'
+    assert Config.PORT == 5000
+    assert 'wav' in Config.ALLOWED_EXTENSIONS
+    assert Config.is_allowed_file('test.WAV')
+    assert not Config.is_allowed_file('test.txt')
+    
+    # Settings are read once at import and can't be changed afterwards
+    with pytest.raises(FrozenInstanceError):
+        Config.PORT = 8000
+    
+    # An unknown upload hash fails at startup, not on every upload
+    with pytest.raises(ValueError, match='HASH_ALGO'):
+        replace(Config, HASH_ALGO='md6')
+
+def test_audio_processor():
+    """Test audio processor functionality"""
+    # Test file validation
+    mock_file = Mock()
+    mock_file.filename = 'test.wav'
+    
+    is_valid, error = AudioProcessor.validate_audio_file(mock_file)
+    assert is_valid, f"Should be valid: {error}"
+    
+    # Test invalid file
+    mock_file.filename = 'test.txt'
+    is_valid, error = AudioProcessor.validate_audio_file(mock_file)
+    assert not is_valid, "Should be invalid for .txt file"
+    
+    # Test oversized upload
+    mock_file.filename = 'test.wav'
+    is_valid, error = AudioProcessor.validate_audio_file(mock_file, Config.MAX_FILE_SIZE_BYTES + 1)
+    assert not is_valid, "Should be invalid when Content-Length exceeds the limit"
+
+def test_probe_duration_without_header_duration():
+    """Test WebM without a header duration is timed from its packets, not decoded"""
+    import subprocess
+    
+    def ffprobe(args, **kwargs):
+        if 'format=duration' in args:
+            return subprocess.CompletedProcess(args, 0, stdout=b'N/A\n')
+        return subprocess.CompletedProcess(args, 0, stdout=b'0.000000,0.020000\n2.980000,0.020000\nN/A,N/A\n')
+    
+    with patch('audio_processor.subprocess.run', side_effect=ffprobe), \
+         patch('audio_processor.AudioSegment.from_file') as mock_decode:
+        assert AudioProcessor.probe_duration('clip.webm') == pytest.approx(3.0)
+    
+    mock_decode.assert_not_called()
+
+def test_orphan_sweep_skips_queued_uploads():
+    """Test the sweep only deletes the app's own request files, not queued uploads"""
+    import audio_processor
+    
+    request_file = os.path.join(Config.UPLOAD_FOLDER, audio_processor.TEMP_FILE_PREFIX + 'request.wav')
+    queued_file = os.path.join(Config.UPLOAD_FOLDER, audio_processor.TEMP_FILE_PREFIX + 'queued.wav')
+    unrelated_file = os.path.join(Config.UPLOAD_FOLDER, 'notes.txt')
+    for path in (request_file, queued_file, unrelated_file):
+        with open(path, 'wb') as f:
+            f.write(b'RIFF')
+    queued_file = AudioProcessor.move_to_queue_folder(queued_file)
+    
+    AudioProcessor.sweep_orphan_files(0)
+    assert not os.path.exists(request_file)
+    assert os.path.exists(queued_file)
+    
+    # Files the app didn't write are never deleted
+    assert os.path.exists(unrelated_file)
+    os.remove(unrelated_file)
+    
+    AudioProcessor.sweep_orphan_files(0, audio_processor.QUEUE_FOLDER)
+    assert not os.path.exists(queued_file)
+
+def test_temperature_analyzer():
+    """Test a transcript is analyzed from a mocked OpenAI chat response"""
+    import httpx
+    import temperature_analyzer
+    from llm_cache import LLMCache
+    
+    test_transcript = "Hello, how are you today? Everything is going well."
+    requests = []
+    
+    def handler(request):
+        requests.append(orjson.loads(request.content))
+        if len(requests) > 1:
+            return httpx.Response(401, json={'error': {'message': 'Incorrect API key provided'}})
+        content = orjson.dumps({
+            'temperature': 25,
+            'confidence': 0.8,
+            'reasoning': 'Calm conversation.',
+            'topics': ['greetings'],
+            'emotional_indicators': ['friendly']
+        }).decode()
+        return httpx.Response(200, json={'choices': [{'message': {'content': content}}]})
+    
+    with patch.object(temperature_analyzer, '_HTTP', httpx.Client(transport=httpx.MockTransport(handler))), \
+         patch.object(TemperatureAnalyzer, 'llm_cache', LLMCache(ttl_seconds=0)), \
+         patch.object(TemperatureAnalyzer, '_uses_semantic_cache', return_value=False):
+        result = TemperatureAnalyzer.analyze_conversation_temperature(test_transcript)
+        failed = TemperatureAnalyzer.analyze_conversation_temperature(test_transcript)
+    
+    assert requests[0]['model'] == Config.GPT_MODEL
+    assert requests[0]['response_format'] == {'type': 'json_object'}
+    assert test_transcript in requests[0]['messages'][1]['content']
+    
+    assert result['success']
+    assert result['temperature'] == 25
+    assert result['confidence'] == 0.8
+    assert result['analysis_summary'] == 'Calm conversation. Topics: greetings. Emotional indicators: friendly.'
+    assert result['transcript_length'] == len(test_transcript)
+    
+    # API errors give a neutral failed result instead of raising
+    assert not failed['success']
+    assert 'Incorrect API key provided' in failed['error']
+
+def test_temperature_analyzer_batch():
+    """Test concurrent batch analysis with mock"""
+    async def mock_analyze(path):
+        await asyncio.sleep(0)
+        return {'success': True, 'temperature': len(path)}
+    
+    with patch.object(TemperatureAnalyzer, 'aanalyze_audio_file', side_effect=mock_analyze):
+        paths = ['a.wav', 'bb.wav', 'ccc.wav']
+        results = asyncio.run(TemperatureAnalyzer.analyze_audio_files_batch(paths, concurrency=2))
+        assert [result['temperature'] for result in results] == [len(path) for path in paths]
+
+def test_temperature_analyzer_batch_repeated(tmp_path):
+    """Test that consecutive batches, each on its own event loop, both reach the API"""
+    import threading
+    import temperature_analyzer
+    from llm_cache import LLMCache
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    
+    class OpenAIStub(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # Keep connections alive in the client's pool
+        
+        def do_POST(self):
+            self.rfile.read(int(self.headers['Content-Length']))
+            if self.path.endswith('/audio/transcriptions'):
+                body = {'text': 'We need to decide on the budget for next year before Friday.'}
+            else:
+                body = {'choices': [{'message': {'content': '{"temperature": 55}'}}]}
+            content = orjson.dumps(body)
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+        
+        def log_message(self, *args):
+            pass
+    
+    server = ThreadingHTTPServer(('127.0.0.1', 0), OpenAIStub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    api_base = f'http://127.0.0.1:{server.server_port}/v1'
+    paths = [str(tmp_path / name) for name in ('a.wav', 'b.wav')]
+    for path in paths:
+        with open(path, 'wb') as f:
+            f.write(_wav().read())
+    
+    try:
+        with patch.object(temperature_analyzer, '_TRANSCRIPTIONS_URL', f'{api_base}/audio/transcriptions'), \
+             patch.object(temperature_analyzer, '_CHAT_URL', f'{api_base}/chat/completions'), \
+             patch.object(temperature_analyzer, 'Config', replace(Config, VAD_MIN_SPEECH_RATIO=0)), \
+             patch.object(TemperatureAnalyzer, 'llm_cache', LLMCache(ttl_seconds=0)), \
+             patch.object(TemperatureAnalyzer, '_uses_semantic_cache', return_value=False), \
+             patch.object(AudioProcessor, 'probe_duration', return_value=2.0):
+            for _ in range(2):
+                results = asyncio.run(TemperatureAnalyzer.analyze_audio_files_batch(paths))
+                assert [result.get('error') for result in results] == [None, None]
+                assert [result['temperature'] for result in results] == [55, 55]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def test_temperature_analyzer_batch_bad_result():
+    """Test that a malformed item in a batched GPT response falls back to single analysis"""
+    transcripts = [
+        "We should talk about the budget meeting again tomorrow morning.",
+        "I completely disagree with everything you just said about that!"
+    ]
+    batch_response = orjson.dumps({'results': [
+        {'temperature': 20, 'topics': [1, 2]},
+        {'temperature': 80, 'topics': ['politics']}
+    ]}).decode()
+    fallback = {'success': True, 'temperature': 50}
+    
+    with patch.object(TemperatureAnalyzer, '_chat_call', return_value=batch_response), \
+         patch.object(TemperatureAnalyzer, 'analyze_conversation_temperature', return_value=fallback) as mock_analyze:
+        results = TemperatureAnalyzer.analyze_conversation_temperatures(transcripts)
+    
+    assert results == [fallback, fallback]
+    assert mock_analyze.call_count == len(transcripts)
+
+def test_batch_analyzer_short_transcripts():
+    """Test that short transcripts get canned results instead of batch requests"""
+    from batch_analyzer import BatchAnalyzer
+    
+    transcripts = ['', 'um okay', 'We need to decide on the budget for next year before Friday.']
+    submitted = []
+    
+    def create_file(file, purpose):
+        submitted.extend(orjson.loads(line) for line in file[1].read().splitlines())
+        return Mock(id='file-1')
+    
+    client = Mock()
+    client.files.create.side_effect = create_file
+    client.batches.create.return_value = Mock(id='batch-1')
+    
+    with patch.object(TemperatureAnalyzer, 'client', client):
+        batch_analyzer = BatchAnalyzer()
+        batch_id = batch_analyzer.submit(transcripts)
+        
+        assert [line['custom_id'] for line in submitted] == ['t2-60']
+        # The same chat request the interactive path sends
+        assert submitted[0]['body'] == orjson.loads(orjson.dumps(TemperatureAnalyzer.analysis_request_body(transcripts[2])))
+        
+        client.batches.retrieve.return_value = Mock(
+            status='completed', metadata={'count': '3'}, output_file_id='file-2', error_file_id=None
+        )
+        client.files.content.return_value.iter_lines.return_value = [orjson.dumps({
+            'custom_id': 't2-60',
+            'response': {'status_code': 200, 'body': {'choices': [{'message': {'content': '{"temperature": 60}'}}]}}
+        }).decode()]
+        results = batch_analyzer.poll(batch_id)
+    
+    assert [result['temperature'] for result in results] == [
+        TemperatureAnalyzer.analyze_conversation_temperature(transcripts[0])['temperature'],
+        TemperatureAnalyzer.analyze_conversation_temperature(transcripts[1])['temperature'],
+        60
+    ]
+
+def test_silence_detection_disabled():
+    """Test that VAD_MIN_SPEECH_RATIO=0 skips the speech detection decode"""
+    import temperature_analyzer
+    
+    failed_transcription = {'text': '', 'success': False, 'error': 'mocked'}
+    with patch.object(temperature_analyzer, 'Config', replace(Config, VAD_MIN_SPEECH_RATIO=0)), \
+         patch.object(AudioProcessor, 'speech_ratio') as mock_speech_ratio, \
+         patch.object(TemperatureAnalyzer, 'transcribe_audio', return_value=failed_transcription), \
+         patch.object(TemperatureAnalyzer, 'atranscribe_audio', return_value=failed_transcription):
+        assert not TemperatureAnalyzer.analyze_audio_file('clip.wav')['success']
+        assert not asyncio.run(TemperatureAnalyzer.aanalyze_audio_file('clip.wav'))['success']
+    
+    mock_speech_ratio.assert_not_called()
+
+def test_openai_error_message():
+    """Test that OpenAI's error message is kept in HTTP errors"""
+    import httpx
+    import temperature_analyzer
+    
+    request = httpx.Request('POST', temperature_analyzer._CHAT_URL)
+    response = httpx.Response(401, request=request, json={'error': {'message': 'Incorrect API key provided'}})
+    
+    with pytest.raises(httpx.HTTPStatusError, match='Incorrect API key provided'):
+        temperature_analyzer._chat_content(response)
+    
+    # Rate limits are still retried
+    response = httpx.Response(429, request=request, content=b'')
+    with pytest.raises(httpx.HTTPStatusError) as error:
+        temperature_analyzer._chat_content(response)
+    assert temperature_analyzer._is_transient(error.value)
+
+def test_short_transcript_results():
+    """Test short transcripts are matched to canned results by length and content"""
+    silence = TemperatureAnalyzer.short_transcript_result('')
+    minimal = TemperatureAnalyzer.short_transcript_result('hey')
+    filler = TemperatureAnalyzer.short_transcript_result('Um   okay yeah')
+    
+    assert silence['emotional_indicators'] == ['silence']
+    assert minimal['emotional_indicators'] == ['minimal_speech']
+    assert minimal['analysis_summary'].startswith('Minimal speech detected: "hey"')
+    assert filler['emotional_indicators'] == ['filler_words']
+    
+    # Length boundaries of the canned results
+    assert TemperatureAnalyzer.short_transcript_result('x')['emotional_indicators'] == ['minimal_speech']
+    assert TemperatureAnalyzer.short_transcript_result('x' * 9)['emotional_indicators'] == ['minimal_speech']
+    assert TemperatureAnalyzer.short_transcript_result('ok' + ' ' * 25 + 'ok')['emotional_indicators'] == ['filler_words']
+    
+    # Short transcripts with real words, or more than three filler words, are analyzed
+    assert TemperatureAnalyzer.short_transcript_result('I hate this plan') is None
+    assert TemperatureAnalyzer.short_transcript_result('um uh um okay') is None
+    assert TemperatureAnalyzer.short_transcript_result('okayish yeah') is None
+    assert TemperatureAnalyzer.short_transcript_result('x' * 30) is None
+
+def test_extract_temperature_from_text():
+    """Test the fallback score extraction from a non-JSON response"""
+    extract = TemperatureAnalyzer._extract_temperature_from_text
+    
+    assert extract('Temperature: 85') == 85
+    assert extract('I would rate this 250 out of 100') == 100
+    assert extract('The speakers were angry and shouting') == 65
+    assert extract('A calm and friendly chat') == 25
+    assert extract('Nothing to report here') == 40
+
+def test_long_audio_split_transcription(tmp_path):
+    """Test audio longer than WHISPER_CHUNK_SECONDS is transcribed in segments"""
+    segment_paths = [str(tmp_path / f'segment_{index}.ogg') for index in range(3)]
+    for path in segment_paths:
+        with open(path, 'wb') as f:
+            f.write(b'OggS')
+    texts = {segment_paths[0]: ' First part. ', segment_paths[1]: '', segment_paths[2]: 'Third part.'}
+    duration = Config.WHISPER_CHUNK_SECONDS * 2.5
+    
+    with patch.object(AudioProcessor, 'probe_duration', return_value=duration), \
+         patch.object(AudioProcessor, 'split_audio', return_value=segment_paths) as mock_split, \
+         patch.object(TemperatureAnalyzer, '_whisper_call', side_effect=lambda path: {'text': texts[path]}):
+        result = TemperatureAnalyzer.transcribe_audio('long.wav')
+    
+    mock_split.assert_called_once_with('long.wav', Config.WHISPER_CHUNK_SECONDS)
+    assert result['success']
+    assert result['text'] == 'First part. Third part.'
+    assert result['duration'] == duration
+    assert not any(os.path.exists(path) for path in segment_paths)
+
+def test_llm_cache():
+    """Test GPT responses are cached under a key of the exact request"""
+    from llm_cache import LLMCache
+    
+    key = LLMCache.make_key('gpt', 'system', 'user', 0.0)
+    assert key == LLMCache.make_key('gpt', 'system', 'user', 0.0)
+    assert key != LLMCache.make_key('gpt', 'system', 'user', 0.5)
+    
+    cache = LLMCache(ttl_seconds=60, max_entries=2, redis_url='')
+    assert cache.get(key) is None
+    cache.set(key, '{"temperature": 40}')
+    assert cache.get(key) == '{"temperature": 40}'
+    assert asyncio.run(cache.aget(key)) == '{"temperature": 40}'
+    
+    disabled = LLMCache(ttl_seconds=0, redis_url='')
+    disabled.set(key, 'ignored')
+    assert disabled.get(key) is None
+
+def test_llm_cache_redis_async():
+    """Test async lookups use redis.asyncio, with a client for each event loop"""
+    from unittest.mock import AsyncMock
+    from llm_cache import LLMCache
+    
+    with patch('redis.Redis.from_url'), patch('redis.asyncio.Redis.from_url') as mock_from_url:
+        mock_from_url.return_value.get = AsyncMock(return_value=b'{"temperature": 70}')
+        mock_from_url.return_value.set = AsyncMock()
+        cache = LLMCache(ttl_seconds=60, redis_url='redis://localhost:6379/1')
+        
+        assert asyncio.run(cache.aget('llm:key')) == '{"temperature": 70}'
+        asyncio.run(cache.aset('llm:key', 'value'))
+    
+    mock_from_url.return_value.set.assert_awaited_once_with('llm:key', b'value', ex=60)
+    assert mock_from_url.call_count == 2
+    cache._redis.get.assert_not_called()
+
+def test_semantic_cache(tmp_path):
+    """Test results are reused for similar embeddings in the same namespace, across workers"""
+    from semantic_cache import SemanticCache
+    
+    directory = str(tmp_path / 'semantic_cache')
+    first = SemanticCache(directory=directory, threshold=0.95, ttl_seconds=60)
+    second = SemanticCache(directory=directory, threshold=0.95, ttl_seconds=60)
+    namespace = SemanticCache.make_namespace('gpt-3.5-turbo-0125', '1')
+    assert namespace == SemanticCache.make_namespace('gpt-3.5-turbo', '1')
+    
+    assert first.lookup(namespace, [1.0, 0.0, 0.0]) is None
+    first.add(namespace, [1.0, 0.0, 0.0], {'temperature': 70})
+    
+    assert first.lookup(namespace, [0.99, 0.05, 0.0]) == {'temperature': 70}
+    assert first.lookup(namespace, [0.0, 1.0, 0.0]) is None
+    assert first.lookup('other-model:1', [1.0, 0.0, 0.0]) is None
+    
+    # Another worker's entries are picked up once the generation changes
+    assert second.lookup(namespace, [1.0, 0.0, 0.0]) == {'temperature': 70}
+    second.add(namespace, [0.0, 0.0, 1.0], {'temperature': 20})
+    assert first.lookup(namespace, [0.0, 0.0, 1.0]) == {'temperature': 20}
+
+def test_openai_scheduler():
+    """Test the scheduler returns each request's result or error, and paces them"""
+    import time
+    from openai_scheduler import OpenAIScheduler, TokenBucket
+    
+    async def run_jobs():
+        scheduler = OpenAIScheduler(rpm=6000, tpm=100000, workers=2)
+        
+        async def request(value):
+            await asyncio.sleep(0)
+            if value is None:
+                raise ValueError('request failed')
+            return value
+        
+        results = await asyncio.gather(*(scheduler.submit(lambda value=value: request(value), 10) for value in range(5)))
+        with pytest.raises(ValueError, match='request failed'):
+            await scheduler.submit(lambda: request(None), 10)
+        return results
+    
+    assert asyncio.run(run_jobs()) == [0, 1, 2, 3, 4]
+    
+    # A drained bucket waits for the refill: 60 units at 6000 per minute take 0.6s
+    async def drain_and_wait():
+        bucket = TokenBucket(6000)
+        await bucket.acquire(6000)
+        started = time.monotonic()
+        await bucket.acquire(60)
+        return time.monotonic() - started
+    
+    assert asyncio.run(drain_and_wait()) >= 0.5
+
+def test_flask_app_import():
+    """Test that Flask app can be imported"""
+    import app
+    assert hasattr(app, 'app')
+    assert hasattr(app, 'health_check')
+    assert hasattr(app, 'analyze_audio')
+
+@pytest.fixture
+def client():
+    import app
+    return app.app.test_client()
+
+@pytest.fixture
+def mock_pipeline():
+    """Replace the ffmpeg and OpenAI stages of the analysis pipeline."""
+    analysis_result = {
+        'success': True,
+        'temperature': 42,
+        'confidence': 0.7,
+        'analysis_summary': 'Calm conversation',
+        'timestamp': '2024-01-01T00:00:00Z',
+        'transcript_length': 20
+    }
+    with patch.object(AudioProcessor, 'probe_duration', return_value=2.0), \
+         patch.object(AudioProcessor, 'prepare_audio_for_transcription', side_effect=lambda path: path), \
+         patch.object(TemperatureAnalyzer, 'analyze_audio_file', return_value=analysis_result) as mock_analyze:
+        yield mock_analyze
+
+def _wav(seconds: float = 2.0, tone: int = 0) -> io.BytesIO:
+    """A mono 16kHz WAV file; different tones give different file hashes."""
+    audio = io.BytesIO()
+    with wave.open(audio, 'wb') as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(16000)
+        wav_file.writeframes(tone.to_bytes(2, 'little') * int(16000 * seconds))
+    audio.seek(0)
+    return audio
+
+def _upload_files():
+    """Files left in the upload folder, ignoring the cache directories."""
+    return [entry.name for entry in os.scandir(Config.UPLOAD_FOLDER) if entry.is_file()]
+
+def test_analyze_audio_upload(client, mock_pipeline):
+    """Test a valid upload is streamed, analyzed and cleaned up"""
+    response = client.post('/analyze-audio', data={'audio': (_wav(tone=1), 'clip.wav')})
+    
+    assert response.status_code == 200
+    assert response.get_json()['temperature'] == 42
+    assert mock_pipeline.call_count == 1
+    assert mock_pipeline.call_args[0][0].endswith('.wav')
+    assert _upload_files() == []
+
+def test_analyze_audio_missing_field(client):
+    """Test a multipart body without the audio field"""
+    response = client.post('/analyze-audio', data={'other': 'value'}, content_type='multipart/form-data')
+    
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'No audio file provided'
+    assert _upload_files() == []
+
+def test_analyze_audio_bad_extension(client):
+    """Test an unsupported file is rejected from the first chunk of the body"""
+    boundary, body = encode_multipart({'audio': FileStorage(io.BytesIO(b'x' * 1024 * 1024), filename='clip.exe')})
+    body_stream = io.BytesIO(body)
+    
+    response = client.post(
+        '/analyze-audio',
+        input_stream=body_stream,
+        content_type=f'multipart/form-data; boundary={boundary}',
+        content_length=len(body)
+    )
+    
+    assert response.status_code == 400
+    assert 'Invalid file format' in response.get_json()['details']
+    assert body_stream.tell() < len(body)
+    assert _upload_files() == []
+
+def test_analyze_audio_not_multipart(client):
+    """Test a request body that isn't multipart/form-data"""
+    response = client.post('/analyze-audio', data=b'{}', content_type='application/json')
+    
+    assert response.status_code == 400
+    assert _upload_files() == []
+
+def test_analyze_audio_too_large(client):
+    """Test an upload over the size limit"""
+    oversized = io.BytesIO(b'x' * (Config.MAX_FILE_SIZE_BYTES + 1))
+    response = client.post('/analyze-audio', data={'audio': (oversized, 'clip.wav')})
+    
+    assert response.status_code == 413
+    assert _upload_files() == []
+
+def test_analyze_audio_cached(client, mock_pipeline):
+    """Test a repeated upload is served from the response cache"""
+    first = client.post('/analyze-audio', data={'audio': (_wav(tone=2), 'clip.wav')})
+    second = client.post('/analyze-audio', data={'audio': (_wav(tone=2), 'again.wav')})
+    
+    assert first.status_code == 200 and 'cached' not in first.get_json()
+    assert second.status_code == 200 and second.get_json()['cached'] is True
+    assert second.get_json()['temperature'] == 42
+    assert mock_pipeline.call_count == 1
+    assert _upload_files() == []
\ No newline at end of file
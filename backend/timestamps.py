@@ -0,0 +1,17 @@
+import time
+from datetime import datetime, timezone
+
+# Formatted timestamp, regenerated at most once per second
+_last_timestamp = (0, '')
+
+def now_iso() -> str:
+    """
+    Current UTC time as an ISO 8601 string with second resolution.
+    
+    Used for every timestamp in API responses and analysis results.
+    """
+    global _last_timestamp
+    now = int(time.time())
+    if now != _last_timestamp[0]:
+        _last_timestamp = (now, datetime.fromtimestamp(now, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'))
+    return _last_timestamp[1]
\ No newline at end of file
@@ -0,0 +1,10 @@
+"""
+WSGI entry point for production servers.
+
+Run with:
+    gunicorn -c gunicorn.conf.py wsgi:application
+"""
+
+from app import app
+
+application = app